@@ -1,11 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from typing import Any
+
 import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
 from homeassistant.helpers import config_validation as cv
 
-from .const import DOMAIN
+from .const import CONF_REQUEST_BUDGET, DOMAIN
+from .base_coordinator import async_remove_snapshot
+from .scheduler import get_scheduler
 
 from .electricity.coordinator import ElectricityDataUpdateCoordinator
 from .water.coordinator import WaterDataUpdateCoordinator
@@ -15,40 +26,128 @@ from .management.coordinator import ManagementDataUpdateCoordinator
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 SERVICE_REFRESH_DATA = "refresh_data"
+SERVICE_GET_DATA = "get_data"
+
+SERVICE_TYPES = ["electricity", "water", "tbo", "management"]
+DEFAULT_MAX_CONCURRENCY = 4
 
 REFRESH_DATA_SCHEMA = vol.Schema(
     {
         vol.Optional("entry_id"): cv.string,
+        vol.Optional("service"): vol.In(SERVICE_TYPES),
+        vol.Optional("max_concurrency", default=DEFAULT_MAX_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=16)
+        ),
     }
 )
 
+GET_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Optional("entry_id"): cv.string,
+        vol.Optional("service"): vol.In(SERVICE_TYPES),
+    }
+)
+
+
+def _selected(hass: HomeAssistant, call: ServiceCall) -> dict[str, Any]:
+    """Coordinators matching the optional entry_id / service filters."""
+    entry_id = call.data.get("entry_id")
+    service = call.data.get("service")
+
+    return {
+        key: coordinator
+        for key, coordinator in hass.data.get(DOMAIN, {}).items()
+        if (entry_id is None or key == entry_id)
+        and (service is None or coordinator.SERVICE == service)
+    }
+
+
+async def _async_refresh_entry(coordinator) -> dict[str, Any]:
+    """Refresh one entry and describe the outcome."""
+    started = time.monotonic()
+    error: str | None = None
+
+    try:
+        await coordinator.async_request_refresh()
+    except Exception as err:  # не роняем остальные записи
+        error = str(err)
+
+    if error is None and not coordinator.last_update_success:
+        error = str(coordinator.last_exception or "update failed")
+
+    # прошлые данные вместо свежих — тоже неудачный запрос к API
+    stale = error is None and coordinator.stale
+    if stale:
+        error = coordinator.stale_reason or "update failed"
+
+    return {
+        "service": coordinator.SERVICE,
+        "account_id": coordinator.account_id,
+        "success": error is None,
+        "error": error,
+        "stale": stale,
+        "duration": round(time.monotonic() - started, 3),
+    }
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     hass.data.setdefault(DOMAIN, {})
     
-    async def handle_refresh_data(call: ServiceCall) -> None:
+    async def handle_refresh_data(call: ServiceCall) -> ServiceResponse:
         """Handle refresh data service call.
         
-        If entry_id is provided, refresh only that configuration.
-        If entry_id is not provided, refresh all configurations.
+        If entry_id is provided, refresh only that configuration,
+        otherwise all configurations (optionally of one service type).
+        Entries are refreshed concurrently, at most max_concurrency at
+        a time; the response holds the outcome per entry_id.
         """
-        entry_id = call.data.get("entry_id")
-        
-        if entry_id:
-            # Refresh specific configuration
-            if entry_id in hass.data.get(DOMAIN, {}):
-                coordinator = hass.data[DOMAIN][entry_id]
-                await coordinator.async_request_refresh()
-        else:
-            # Refresh all configurations
-            for coordinator in hass.data.get(DOMAIN, {}).values():
-                await coordinator.async_request_refresh()
+        coordinators = _selected(hass, call)
+
+        semaphore = asyncio.Semaphore(call.data["max_concurrency"])
+
+        async def _refresh(coordinator) -> dict[str, Any]:
+            async with semaphore:
+                return await _async_refresh_entry(coordinator)
+
+        results = await asyncio.gather(
+            *(_refresh(coordinator) for coordinator in coordinators.values())
+        )
+
+        if not call.return_response:
+            return None
+        return {"entries": dict(zip(coordinators, results))}
     
     hass.services.async_register(
         DOMAIN,
         SERVICE_REFRESH_DATA,
         handle_refresh_data,
         schema=REFRESH_DATA_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def handle_get_data(call: ServiceCall) -> ServiceResponse:
+        """Return the full canonical data (history, tariffs, gas).
+
+        Вложенные разделы не хранятся в атрибутах сенсоров (recorder),
+        их отдаёт этот сервис по запросу — без обращения к API.
+        """
+        return {
+            "entries": {
+                key: {
+                    "service": coordinator.SERVICE,
+                    "account_id": coordinator.account_id,
+                    "data": coordinator.data,
+                }
+                for key, coordinator in _selected(hass, call).items()
+            }
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_DATA,
+        handle_get_data,
+        schema=GET_DATA_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
     )
     
     return True
@@ -59,6 +158,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     service = entry.data["service"]
 
+    # параметры записи (options flow): свой дневной лимит запросов
+    options = {
+        key: entry.options[key] for key in (CONF_REQUEST_BUDGET,) if key in entry.options
+    }
+
     # -------------------------------------------------
     # ELECTRICITY
     # -------------------------------------------------
@@ -69,6 +173,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             username=entry.data["username"],
             password=entry.data["password"],
             account_id=entry.data["account_id"],
+            options={
+                "tariff_history": entry.data.get("tariff_history", False),
+                **options,
+            },
         )
 
     # -------------------------------------------------
@@ -81,6 +189,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             username=entry.data["username"],
             password=entry.data["password"],
             account_id=entry.data["account_id"],
+            options=options,
         )
 
     # -------------------------------------------------
@@ -93,6 +202,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             username=entry.data["username"],
             password=entry.data["password"],
             account_id=entry.data["account_id"],
+            options=options,
         )
     # -------------------------------------------------
     # MANAGEMENT
@@ -107,22 +217,52 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             entry.data["account_id"],
             enable_gas=entry.data.get("enable_gas", False),
             gas_account_id=entry.data.get("gas_account_id"),
+            options=options,
         )
     else:
         return False
 
-    # первый запрос данных
-    await coordinator.async_config_entry_first_refresh()
+    scheduler = get_scheduler(hass)
+
+    # старт с сохранённого снапшота; сеть — через планировщик
+    # (устаревший снапшот — вскоре, с разбросом между записями)
+    if await coordinator.async_restore_snapshot():
+        scheduler.async_add(coordinator, soon=not coordinator.snapshot_fresh)
+    else:
+        # первый запрос данных — тоже в очереди, с учётом лимита на хост
+        try:
+            await scheduler.async_request(
+                coordinator, coordinator.async_config_entry_first_refresh
+            )
+        except Exception:
+            # запись не загрузится → отпускаем её пул соединений
+            await coordinator.async_shutdown()
+            raise
+        scheduler.async_add(coordinator)
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    # смена параметров → перезагрузка записи с новым лимитом
+    entry.async_on_unload(entry.add_update_listener(_async_reload_entry))
+
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor", "button"])
 
     return True
 
 
+async def _async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, ["sensor", "button"])
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        get_scheduler(hass).async_remove(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if coordinator is not None:
+            await coordinator.async_shutdown()
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await async_remove_snapshot(hass, entry.entry_id)
@@ -1,17 +1,251 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any
+import hashlib
+import json as jsonlib
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, replace
+from typing import Any, Protocol
+from urllib.parse import urlparse
 
 import aiohttp
 
+from .errors import (
+    ApiError,
+    AuthError,
+    CircuitOpenError,
+    HttpError,
+    RateLimitError,
+    ServerError,
+    TransientError,
+    http_error,
+    rate_limit_in_body,
+)
+from .executor import Step, execute
+from .quota import RequestBudget
+from .resilience import DEFAULT_RETRY, NO_RETRY, RetryPolicy, resilient_call
 
-class ApiError(Exception):
-    """Base API error."""
 
+# Разделы канонических данных с разной частотой обновления:
+# balance — дешёвое «текущее состояние», history — тяжёлые истории.
+SECTION_BALANCE = "balance"
+SECTION_HISTORY = "history"
+ALL_SECTIONS = frozenset({SECTION_BALANCE, SECTION_HISTORY})
 
-class AuthError(ApiError):
-    """Authentication failed."""
+
+class PeriodCache(Protocol):
+    """Storage for immutable data of closed billing periods.
+
+    Реализация решает сама, какой период закрыт: ``set`` для открытого
+    периода молча игнорируется.
+    """
+
+    def get(self, name: str, period: str) -> Any | None:
+        ...
+
+    def set(self, name: str, period: str, value: Any) -> None:
+        ...
+
+
+async def cached_period(
+    cache: PeriodCache | None,
+    name: str,
+    period: str,
+    fetch: Callable[[], Awaitable[Any]],
+    *,
+    valid: Callable[[Any], bool] | None = None,
+) -> Any:
+    """Serve ``name`` for ``period`` from cache, fetch and store otherwise."""
+    if cache is not None:
+        cached = cache.get(name, period)
+        if cached is not None:
+            return cached
+
+    value = await fetch()
+
+    if cache is not None and value is not None and (valid is None or valid(value)):
+        cache.set(name, period, value)
+
+    return value
+
+
+class RequestCoalescer:
+    """Single-flight for identical upstream reads.
+
+    Одинаковые запросы (метод, URL, параметры, тело, заголовки вкл.
+    авторизацию), идущие одновременно, получают один общий ответ.
+    С ``fresh_for`` ответ ещё столько секунд отдаётся повторным вызовам.
+    Общий ответ нельзя изменять на месте.
+    """
+
+    MAX_FRESH = 256
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Task[Any]] = {}
+        self._fresh: dict[str, tuple[float, Any]] = {}
+
+    @staticmethod
+    def key(
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        json: Any = None,
+        params: dict[str, Any] | None = None,
+    ) -> str:
+        raw = jsonlib.dumps(
+            [method.upper(), url, params, json, headers],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def run(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        *,
+        fresh_for: float = 0.0,
+    ) -> Any:
+        now = asyncio.get_running_loop().time()
+
+        cached = self._fresh.get(key)
+        if cached is not None and now < cached[0]:
+            return cached[1]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, fetch, fresh_for))
+            self._inflight[key] = task
+
+        # отмена одного ожидающего не должна отменять общий запрос
+        return await asyncio.shield(task)
+
+    async def _run(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        fresh_for: float,
+    ) -> Any:
+        try:
+            value = await fetch()
+        finally:
+            self._inflight.pop(key, None)
+
+        if fresh_for > 0:
+            now = asyncio.get_running_loop().time()
+            if len(self._fresh) >= self.MAX_FRESH:
+                self._fresh = {
+                    k: item for k, item in self._fresh.items() if now < item[0]
+                }
+            self._fresh[key] = (now + fresh_for, value)
+
+        return value
+
+
+# один на процесс: общий для всех клиентов и записей
+request_coalescer = RequestCoalescer()
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    etag: str | None
+    last_modified: str | None
+    digest: bytes
+    value: Any
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Last response of every idempotent read of one API client.
+
+    GET / HEAD с ETag / Last-Modified → условный запрос, 304 → прошлый
+    объект. Остальные (в т.ч. POST-чтения: условный POST по RFC 9110
+    получил бы 412) — хеш тела: совпал → прошлый объект без разбора
+    JSON. Неизменившийся ответ — тот же объект, поэтому нормализацию
+    можно пропускать по ``is`` (см. IdentityMemo). Изменять нельзя.
+
+    Свой у каждого клиента (одна запись): вытеснение чужими записями
+    не грозит. Ключ — без заголовков авторизации, чтобы смена токена
+    не сбрасывала кэш.
+    """
+
+    MAX_ITEMS = 64
+    AUTH_HEADERS = frozenset({"authorization", "token"})
+
+    def __init__(self) -> None:
+        self._items: dict[str, CachedResponse] = {}
+
+    @classmethod
+    def key(
+        cls,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        json: Any = None,
+        params: dict[str, Any] | None = None,
+    ) -> str:
+        headers = {
+            name: value
+            for name, value in (headers or {}).items()
+            if name.lower() not in cls.AUTH_HEADERS
+        }
+        return RequestCoalescer.key(
+            method, url, headers=headers, json=json, params=params
+        )
+
+    def get(self, key: str) -> CachedResponse | None:
+        return self._items.get(key)
+
+    def adopt(self, key: str, item: CachedResponse) -> Any:
+        """Store a (possibly shared) response and return the value to use.
+
+        Тело не изменилось → остаётся прежний объект этого клиента, чтобы
+        его IdentityMemo продолжал попадать, даже если ответ получил
+        другой клиент объединённого запроса.
+        """
+        previous = self._items.get(key)
+        if previous is not None and previous.digest == item.digest:
+            item = replace(item, value=previous.value)
+        self.put(key, item)
+        return item.value
+
+    def put(self, key: str, item: CachedResponse) -> None:
+        self._items.pop(key, None)
+        if len(self._items) >= self.MAX_ITEMS:
+            # самый старый ответ (dict хранит порядок вставки)
+            del self._items[next(iter(self._items))]
+        self._items[key] = item
+
+
+class IdentityMemo:
+    """Derived values kept while their source response stays the same object."""
+
+    def __init__(self) -> None:
+        self._items: dict[str, tuple[Any, Any, Any]] = {}
+
+    def get(
+        self,
+        name: str,
+        source: Any,
+        args: Any,
+        compute: Callable[[], Any],
+    ) -> Any:
+        item = self._items.get(name)
+        if item is not None and item[0] is source and item[1] == args:
+            return item[2]
+
+        value = compute()
+        self._items[name] = (source, args, value)
+        return value
 
 
 class BaseApiClient:
@@ -19,14 +253,24 @@ class BaseApiClient:
         self,
         base_url: str,
         timeout: int = 30,
+        max_concurrency: int = 4,
+        retry: RetryPolicy = DEFAULT_RETRY,
     ) -> None:
         self._base_url = base_url.rstrip("/")
+        self._host = urlparse(self._base_url).hostname or ""
+        self._retry = retry
         self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._max_concurrency = max_concurrency
         self._session: aiohttp.ClientSession | None = None
+        # дневной бюджет запросов; задаёт владелец клиента (координатор)
+        self.budget: RequestBudget | None = None
+        self._responses = ResponseCache()
+        self._memo = IdentityMemo()
 
     async def _get_session(self) -> aiohttp.ClientSession:
+        """Injected session; the client never opens (and leaks) its own."""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession(timeout=self._timeout)
+            raise ApiError("HTTP session is closed")
         return self._session
 
     async def _request(
@@ -37,10 +281,96 @@ class BaseApiClient:
         headers: dict[str, str] | None = None,
         json: dict[str, Any] | None = None,
         params: dict[str, Any] | None = None,
+        coalesce: bool | None = None,
+        fresh_for: float = 0.0,
+        lenient_json: bool = False,
     ) -> dict[str, Any]:
-        session = await self._get_session()
+        """Perform a request; identical concurrent reads share one response.
+
+        ``coalesce`` по умолчанию включён только для GET; для POST-чтений
+        его нужно включать явно. Логины не объединяются никогда.
+        Объединяемые запросы — идемпотентные чтения: их временные ошибки
+        повторяются по ``retry``. Все запросы идут через circuit breaker хоста.
+        Ответ не-JSON — сразу ошибка; ``lenient_json`` разбирает тело как
+        JSON при любом Content-Type. Неизменившиеся чтения узнаются по
+        ETag / хешу тела (см. ResponseCache).
+        """
         url = f"{self._base_url}{path}"
 
+        if coalesce is None:
+            coalesce = method.upper() == "GET"
+
+        key = (
+            request_coalescer.key(
+                method, url, headers=headers, json=json, params=params
+            )
+            if coalesce
+            else None
+        )
+
+        cache_key = (
+            ResponseCache.key(method, url, headers=headers, json=json, params=params)
+            if coalesce
+            else None
+        )
+
+        async def _fetch() -> CachedResponse:
+            cached = self._responses.get(cache_key) if cache_key is not None else None
+            return await resilient_call(
+                self._host,
+                lambda: self._send(
+                    method,
+                    url,
+                    headers=headers,
+                    json=json,
+                    params=params,
+                    lenient_json=lenient_json,
+                    cached=cached,
+                ),
+                retry=self._retry if coalesce else NO_RETRY,
+                budget=self.budget,
+            )
+
+        if key is None:
+            return (await _fetch()).value
+
+        # общий ответ попадает в ResponseCache каждого участника
+        item = await request_coalescer.run(key, _fetch, fresh_for=fresh_for)
+        return self._responses.adopt(cache_key, item)
+
+    async def _login_request(
+        self,
+        method: str,
+        path: str,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        """Login request: never coalesced or retried.
+
+        Сообщение о блокировке попыток в теле успешного ответа —
+        RateLimitError, а не «неверный пароль».
+        """
+        data = await self._request(method, path, coalesce=False, **kwargs)
+        if (err := rate_limit_in_body(data)) is not None:
+            raise err
+        return data
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        json: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
+        lenient_json: bool = False,
+        cached: CachedResponse | None = None,
+    ) -> CachedResponse:
+        """One HTTP exchange; ``cached`` — прошлый ответ на тот же запрос."""
+        session = await self._get_session()
+
+        if cached is not None and method.upper() in ("GET", "HEAD"):
+            headers = {**(headers or {}), **cached.conditional_headers()}
+
         try:
             async with session.request(
                 method=method,
@@ -48,20 +378,75 @@ class BaseApiClient:
                 headers=headers,
                 json=json,
                 params=params,
+                timeout=self._timeout,
             ) as response:
-                if response.status == 401:
-                    raise AuthError("Unauthorized")
+                if response.status == 304 and cached is not None:
+                    return cached
 
                 if response.status >= 400:
                     text = await response.text()
-                    raise ApiError(
-                        f"API error {response.status}: {text}"
+                    raise http_error(response.status, text, response.headers)
+
+                # HTML-заглушка вместо JSON: тело не читаем, не повторяем
+                content_type = response.content_type
+                if (
+                    not lenient_json
+                    and content_type != "application/json"
+                    and not content_type.endswith("+json")
+                ):
+                    raise HttpError(
+                        f"Unexpected content type {content_type}",
+                        status=response.status,
                     )
 
-                return await response.json()
+                body = await response.read()
+                digest = hashlib.blake2b(body, digest_size=16).digest()
+
+                if cached is not None and cached.digest == digest:
+                    value = cached.value
+                else:
+                    try:
+                        value = jsonlib.loads(body)
+                    except ValueError as exc:
+                        raise HttpError(
+                            "Invalid JSON response", status=response.status
+                        ) from exc
+
+                return CachedResponse(
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    digest=digest,
+                    value=value,
+                )
 
         except asyncio.TimeoutError as exc:
-            raise ApiError("Request timeout") from exc
+            raise TransientError("Request timeout") from exc
 
         except aiohttp.ClientError as exc:
-            raise ApiError("HTTP client error") from exc
+            raise TransientError("HTTP client error") from exc
+
+    async def _gather(self, *aws: Awaitable[Any]) -> list[Any]:
+        """Run independent requests concurrently.
+
+        Не более ``max_concurrency`` запросов одновременно. Порядок
+        результатов совпадает с порядком аргументов. При первой ошибке
+        остальные запросы отменяются, ошибка пробрасывается как есть.
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def _bounded(aw: Awaitable[Any]) -> Any:
+            async with semaphore:
+                return await aw
+
+        tasks = [asyncio.ensure_future(_bounded(aw)) for aw in aws]
+
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def _execute(self, *steps: Step) -> dict[str, Any]:
+        """Run a dependency-aware request plan (see ``executor.execute``)."""
+        return await execute(steps, limit=self._max_concurrency)
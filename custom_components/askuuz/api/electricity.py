@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Any
 
-from .base import BaseApiClient, ApiError
+from .base import (
+    ALL_SECTIONS,
+    SECTION_HISTORY,
+    BaseApiClient,
+    ApiError,
+    PeriodCache,
+    cached_period,
+)
+from .executor import Step
 
 
 class ElectricityApiClient(BaseApiClient):
@@ -10,17 +19,40 @@ class ElectricityApiClient(BaseApiClient):
 
     Правила:
     - НЕ хранит токены
-    - НЕ делает retry
+    - Повторяет только идемпотентные чтения (см. api/resilience.py)
     - НЕ знает про Home Assistant
     - Делает HTTP + парсинг + нормализацию под канон
     """
 
     BASE_URL = "https://cabinet-api.het.uz/household-consumer/v1/mobile-cabinet"
 
+    # history mode: годы запрашиваются пачками, от текущего к старым
+    HISTORY_BATCH = 4
+    HISTORY_MAX_YEARS = 12
+
     def __init__(self, session) -> None:
         super().__init__(base_url=self.BASE_URL)
         self._session = session
 
+    # ------------------------------------------------------------------
+    # AUTH
+    # ------------------------------------------------------------------
+
+    async def login(self, *, login: str, password: str) -> dict[str, Any]:
+        """Login and return the raw response (token in data.accessToken)."""
+        return await self._login_request(
+            method="POST",
+            path="/user-login",
+            json={
+                "login": login,
+                "password": password,
+            },
+            headers={
+                "Accept": "application/json, text/plain, */*",
+                "Content-Type": "application/json",
+            },
+        )
+
     # ------------------------------------------------------------------
     # RAW endpoints
     # ------------------------------------------------------------------
@@ -64,15 +96,88 @@ class ElectricityApiClient(BaseApiClient):
     # High-level API (returns CANONICAL MODEL)
     # ------------------------------------------------------------------
 
+    async def fetch_monthly_cached(
+        self,
+        token: str,
+        year: int,
+        cache: PeriodCache | None,
+    ) -> dict[str, Any]:
+        """Monthly consumption; a closed year is served from cache."""
+        return await cached_period(
+            cache,
+            "monthly",
+            str(year),
+            lambda: self.fetch_monthly_consumption(token, year),
+            valid=lambda raw: isinstance(raw, dict) and raw.get("status") == 1000,
+        )
+
     async def get_data(
         self,
         token: str,
         account_id: str,
+        cache: PeriodCache | None = None,
+        *,
+        tariff_history: bool = False,
+        sections: frozenset[str] = ALL_SECTIONS,
     ) -> dict[str, Any]:
-        raw = await self.fetch_consumer_state(token, account_id)
+        """Canonical data; without SECTION_HISTORY only consumer-state."""
+        with_history = SECTION_HISTORY in sections
+
+        # Год помесячной статистики зависит от currentPeriod из
+        # consumer-state. Угадываем его по часам и запрашиваем сразу,
+        # параллельно с consumer-state; если не угадали — перезапрос.
+        # Ошибка угаданного года не повторяется вторым запросом: если год
+        # угадан верно, пробрасывается исходная ошибка.
+        now = datetime.now()
+        guessed_year = self._monthly_year(now.year, now.month)
+
+        async def _state(_: dict[str, Any]) -> dict[str, Any]:
+            return await self.fetch_consumer_state(token, account_id)
+
+        async def _guess(_: dict[str, Any]) -> dict[str, Any] | ApiError:
+            try:
+                return await self.fetch_monthly_cached(token, guessed_year, cache)
+            except ApiError as err:
+                return err
+
+        def _guessed(inputs: dict[str, Any]) -> dict[str, Any]:
+            guess = inputs["monthly_guess"]
+            if isinstance(guess, ApiError):
+                raise guess
+            return guess
+
+        async def _monthly(inputs: dict[str, Any]) -> dict[str, Any]:
+            year, month = map(
+                int, inputs["state"]["data"]["currentPeriod"][:7].split("-")
+            )
+            monthly_year = self._monthly_year(year, month)
+
+            if monthly_year == guessed_year:
+                return _guessed(inputs)
+
+            return await self.fetch_monthly_cached(token, monthly_year, cache)
+
+        async def _history(inputs: dict[str, Any]) -> dict[str, list]:
+            return await self.get_history(
+                token,
+                now.year,
+                cache,
+                known={guessed_year: _guessed(inputs)},
+            )
+
+        steps = [Step("state", _state)]
+        if with_history:
+            steps += [
+                Step("monthly_guess", _guess),
+                Step("monthly", _monthly, requires=("state", "monthly_guess")),
+            ]
+        if with_history and tariff_history:
+            steps.append(Step("history", _history, requires=("monthly_guess",)))
 
         try:
-            data = raw["data"]
+            results = await self._execute(*steps)
+
+            data = results["state"]["data"]
 
             result: dict[str, Any] = {
                 "account_id": account_id,
@@ -96,10 +201,7 @@ class ElectricityApiClient(BaseApiClient):
             # Previous month (tariff-based consumption)
             # ----------------------------------------------------------
 
-            year, month = map(int, result["current_period"].split("-"))
-            monthly_year = year - 1 if month == 1 else year
-
-            monthly_raw = await self.fetch_monthly_consumption(token, monthly_year)
+            monthly_raw = results.get("monthly")
 
             if (
                 isinstance(monthly_raw, dict)
@@ -107,25 +209,12 @@ class ElectricityApiClient(BaseApiClient):
                 and isinstance(monthly_raw.get("data"), list)
                 and monthly_raw["data"]
             ):
-                month_data = monthly_raw["data"][-1]
-
-                monthly_block = {
-                    "period": month_data["period"][:7],
-                    "consumption": float(month_data["totalCalcKwh"]) / 1000,
-                    "accrual": float(month_data["totalSum"]) / 100,
-                    "tariffs": [],
-                }
+                result["data"]["last_month"] = self._month_block(
+                    monthly_raw["data"][-1]
+                )
 
-                for t in month_data.get("newMonthlyTariffAndSpendedKwhs") or []:
-                    monthly_block["tariffs"].append(
-                        {
-                            "tariff": float(t["tarifPrice"]) / 100,
-                            "consumption": float(t["consumedKwh"]) / 1000,
-                            "accrual": float(t["totalSumByTariff"]) / 100,
-                        }
-                    )
-
-                result["data"]["last_month"] = monthly_block
+            if "history" in results:
+                result["data"]["history"] = results["history"]
 
             return result
 
@@ -133,3 +222,77 @@ class ElectricityApiClient(BaseApiClient):
             raise ApiError(
                 "Failed to parse electricity consumer-state data"
             ) from exc
+
+    async def get_history(
+        self,
+        token: str,
+        current_year: int,
+        cache: PeriodCache | None = None,
+        *,
+        known: dict[int, dict[str, Any] | None] | None = None,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Per-tariff monthly history for every available year.
+
+        Годы запрашиваются пачками параллельно, от текущего к старым,
+        пока не встретится пустой год старше найденных данных. Закрытые
+        годы (включая пустые) берутся из кеша, так что на последующих
+        опросах в сеть уходит только текущий год.
+        """
+        known = known or {}
+
+        async def _year(year: int) -> list[dict[str, Any]]:
+            raw = known.get(year)
+            if raw is None:
+                raw = await self.fetch_monthly_cached(token, year, cache)
+
+            if not (
+                isinstance(raw, dict)
+                and raw.get("status") == 1000
+                and isinstance(raw.get("data"), list)
+            ):
+                return []
+
+            return [self._month_block(month_data) for month_data in raw["data"]]
+
+        history: dict[str, list[dict[str, Any]]] = {}
+        years = range(current_year, current_year - self.HISTORY_MAX_YEARS, -1)
+
+        try:
+            for start in range(0, len(years), self.HISTORY_BATCH):
+                batch = years[start:start + self.HISTORY_BATCH]
+                months = await self._gather(*(_year(year) for year in batch))
+
+                for year, blocks in zip(batch, months):
+                    if blocks:
+                        history[str(year)] = blocks
+                    elif history:
+                        return history
+
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ApiError(
+                "Failed to parse electricity monthly consumption data"
+            ) from exc
+
+        return history
+
+    @staticmethod
+    def _month_block(month_data: dict[str, Any]) -> dict[str, Any]:
+        """Normalize one month of get-monthly-consumption-by-tariff-new."""
+        return {
+            "period": month_data["period"][:7],
+            "consumption": float(month_data["totalCalcKwh"]) / 1000,
+            "accrual": float(month_data["totalSum"]) / 100,
+            "tariffs": [
+                {
+                    "tariff": float(t["tarifPrice"]) / 100,
+                    "consumption": float(t["consumedKwh"]) / 1000,
+                    "accrual": float(t["totalSumByTariff"]) / 100,
+                }
+                for t in month_data.get("newMonthlyTariffAndSpendedKwhs") or []
+            ],
+        }
+
+    @staticmethod
+    def _monthly_year(year: int, month: int) -> int:
+        """Year that holds the previous month's tariff data."""
+        return year - 1 if month == 1 else year
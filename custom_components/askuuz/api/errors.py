@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+# сообщение сервисов ASKU о превышении лимита попыток
+RATE_LIMIT_MARKERS = ("Количество попыток",)
+
+# коды ошибки в теле ответа, означающие неверный логин / пароль
+INVALID_CREDENTIALS = "invalid_credentials"
+INVALID_CREDENTIALS_CODES = frozenset(
+    {INVALID_CREDENTIALS, "INVALID_CREDENTIALS", "invalid_grant"}
+)
+
+
+class ApiError(Exception):
+    """Base API error."""
+
+
+class HttpError(ApiError):
+    """Upstream answered with an error (or did not answer at all).
+
+    ``status`` — HTTP-статус (None для таймаута / обрыва),
+    ``error_code`` — код ошибки из тела ответа, если он есть,
+    ``retry_after`` — сколько секунд сервис просит подождать.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        status: int | None = None,
+        error_code: str | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.status = status
+        self.error_code = error_code
+        self.retry_after = retry_after
+
+
+class AuthError(HttpError):
+    """Authentication failed (401 / 403): relogin may help."""
+
+
+class TransientError(HttpError):
+    """Temporary upstream failure (timeout, connection, 5xx, 429)."""
+
+
+class RateLimitError(TransientError):
+    """Upstream asks to slow down (429 / «Количество попыток…»)."""
+
+
+class ServerError(TransientError):
+    """Upstream 5xx."""
+
+
+class CircuitOpenError(ApiError):
+    """Upstream host is marked down; the call was not attempted."""
+
+
+def _error_code(text: str) -> str | None:
+    try:
+        body: Any = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(body, dict):
+        return None
+    for key in ("code", "error_code", "errorCode"):
+        if body.get(key) is not None:
+            return str(body[key])
+    return None
+
+
+def _retry_after(value: str | None) -> float | None:
+    """Retry-After header: delta seconds or HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def rate_limit_in_body(body: Any) -> RateLimitError | None:
+    """RateLimitError if a successful (200) response carries a lockout message."""
+    text = body if isinstance(body, str) else json.dumps(body, ensure_ascii=False)
+    if any(marker in text for marker in RATE_LIMIT_MARKERS):
+        return RateLimitError(f"Rate limited: {text}", status=200)
+    return None
+
+
+def login_failed(message: str, response: Any) -> AuthError:
+    """AuthError for a login answered without a token.
+
+    Ответ-объект без токена (``status: false`` и т.п.) — явный отказ в
+    пароле (код INVALID_CREDENTIALS); не-объект — испорченный ответ,
+    пароль не виноват.
+    """
+    if isinstance(response, dict):
+        return AuthError(message, error_code=INVALID_CREDENTIALS)
+    return AuthError(message)
+
+
+def http_error(status: int, text: str, headers: Any = None) -> HttpError:
+    """Build the typed error for an upstream error response."""
+    kwargs = {
+        "status": status,
+        "error_code": _error_code(text),
+        "retry_after": _retry_after(headers.get("Retry-After") if headers else None),
+    }
+    message = f"API error {status}: {text}"
+
+    if status == 429 or any(marker in text for marker in RATE_LIMIT_MARKERS):
+        return RateLimitError(message, **kwargs)
+    if status in (401, 403):
+        return AuthError(message, **kwargs)
+    if status >= 500:
+        return ServerError(message, **kwargs)
+    return HttpError(message, **kwargs)
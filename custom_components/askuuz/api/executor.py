@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_CONCURRENCY = 4
+
+
+@dataclass(frozen=True, slots=True)
+class Step:
+    """One endpoint call of a request plan.
+
+    ``run`` получает dict с результатами шагов, перечисленных в
+    ``requires``, и возвращает свой результат.
+    """
+
+    name: str
+    run: Callable[[dict[str, Any]], Awaitable[Any]]
+    requires: tuple[str, ...] = ()
+
+
+def _check_plan(plan: dict[str, Step]) -> None:
+    """Reject unknown dependencies and cycles (they would deadlock)."""
+    for step in plan.values():
+        missing = set(step.requires) - plan.keys()
+        if missing:
+            raise ValueError(
+                f"Step '{step.name}' requires unknown steps: {sorted(missing)}"
+            )
+
+    pending = {name: set(step.requires) for name, step in plan.items()}
+    while pending:
+        ready = [name for name, deps in pending.items() if not deps]
+        if not ready:
+            raise ValueError(f"Request plan has a cycle: {sorted(pending)}")
+        for name in ready:
+            del pending[name]
+        for deps in pending.values():
+            deps.difference_update(ready)
+
+
+async def execute(
+    steps: Iterable[Step],
+    *,
+    limit: int = DEFAULT_CONCURRENCY,
+) -> dict[str, Any]:
+    """Run a request plan and return results keyed by step name.
+
+    Каждый шаг стартует, как только готовы его зависимости; независимые
+    шаги идут параллельно, но не более ``limit`` одновременно.
+    При первой ошибке остальные шаги отменяются, ошибка пробрасывается
+    как есть.
+    """
+    plan = {step.name: step for step in steps}
+    _check_plan(plan)
+
+    semaphore = asyncio.Semaphore(limit)
+    tasks: dict[str, asyncio.Future[Any]] = {}
+
+    async def _run(step: Step) -> Any:
+        inputs = {dep: await tasks[dep] for dep in step.requires}
+        async with semaphore:
+            return await step.run(inputs)
+
+    # задачи создаются до первого await → все зависимости уже в tasks
+    for name, step in plan.items():
+        tasks[name] = asyncio.ensure_future(_run(step))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+
+    return {name: task.result() for name, task in tasks.items()}
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HostLimiter:
+    """Client-side throttle of one upstream host.
+
+    Token bucket (``rate`` запросов в секунду, запас ``burst``) плюс
+    адаптивный лимит одновременных запросов (AIMD): каждый успешный
+    ответ немного поднимает лимит и темп, перегрузка (таймаут, 429, 5xx,
+    «Количество попыток») делит их пополам.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        *,
+        rate: float,
+        burst: int,
+        max_concurrency: int,
+        min_rate: float,
+    ) -> None:
+        self.host = host
+        self._max_rate = rate
+        self._min_rate = min_rate
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._stamp: float | None = None
+
+        self._max_limit = float(max_concurrency)
+        self._limit = float(max_concurrency)
+        self._active = 0
+        self._waiters: list[asyncio.Future[None]] = []
+
+    # ------------------------------------------------------------------
+    # Slots
+    # ------------------------------------------------------------------
+
+    async def acquire(self) -> None:
+        """Wait for a concurrency slot and a bucket token."""
+        while self._active >= int(self._limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # разбуженный, но отменённый ожидающий не должен съесть побудку
+                self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+        self._active += 1
+        try:
+            while (delay := self._take_token()) > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self.release(None)
+            raise
+
+    def release(self, healthy: bool | None) -> None:
+        """Free the slot; ``healthy`` — verdict on the host (None — no verdict)."""
+        self._active -= 1
+
+        if healthy is True:
+            self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+            self._rate = min(self._max_rate, self._rate + self._max_rate / 20)
+        elif healthy is False:
+            if self._limit > 1 or self._rate > self._min_rate:
+                _LOGGER.debug("Throttling %s", self.host)
+            self._limit = max(1.0, self._limit / 2)
+            self._rate = max(self._min_rate, self._rate / 2)
+
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self._limit) - self._active
+        for waiter in self._waiters:
+            if free <= 0:
+                break
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _take_token(self) -> float:
+        """Take a token; return 0 or the seconds to wait for one."""
+        now = asyncio.get_running_loop().time()
+        if self._stamp is not None:
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._stamp) * self._rate
+            )
+        self._stamp = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self._rate
+
+    # ------------------------------------------------------------------
+    # Diagnostics
+    # ------------------------------------------------------------------
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "concurrency_limit": round(self._limit, 2),
+            "max_concurrency": int(self._max_limit),
+            "active": self._active,
+            "waiting": len(self._waiters),
+            "rate": round(self._rate, 3),
+            "max_rate": self._max_rate,
+            "tokens": round(self._tokens, 2),
+        }
+
+
+class HostLimiters:
+    """Registry of limiters keyed by upstream host."""
+
+    def __init__(
+        self,
+        *,
+        rate: float = 2.0,
+        burst: int = 4,
+        max_concurrency: int = 4,
+        min_rate: float = 0.1,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_rate = min_rate
+        self._limiters: dict[str, HostLimiter] = {}
+
+    def get(self, host: str) -> HostLimiter:
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = HostLimiter(
+                host,
+                rate=self.rate,
+                burst=self.burst,
+                max_concurrency=self.max_concurrency,
+                min_rate=self.min_rate,
+            )
+            self._limiters[host] = limiter
+        return limiter
+
+    def as_dict(self) -> dict[str, Any]:
+        return {host: limiter.as_dict() for host, limiter in self._limiters.items()}
+
+
+# один на процесс: общий для всех клиентов, записей и config flow
+host_limiters = HostLimiters()
@@ -2,24 +2,40 @@ from __future__ import annotations
 
 from typing import Any
 import logging
-import aiohttp
+
+from .base import ApiError, BaseApiClient
+from .errors import login_failed
+from .resilience import DEFAULT_RETRY, RetryPolicy
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class ManagementApiClient:
+class ManagementApiClient(BaseApiClient):
     """API client for ASKU Management Company service.
 
     ❗ Правила:
     - НЕ хранит токены
-    - НЕ делает retry
+    - Повторяет только идемпотентные чтения (см. api/resilience.py)
     - НЕ знает про Home Assistant
     - Только HTTP + возврат данных
     """
 
     BASE_URL = "https://back.my.kommunal.uz/api"
 
-    def __init__(self, session: aiohttp.ClientSession) -> None:
+    # dashboard общий для всех квартир одного логина
+    DASHBOARD_FRESH_FOR = 60
+
+    def __init__(
+        self,
+        session,
+        *,
+        retry: RetryPolicy = DEFAULT_RETRY,
+    ) -> None:
+        super().__init__(
+            base_url=self.BASE_URL,
+            timeout=30,
+            retry=retry,
+        )
         self._session = session
 
     # ------------------------------------------------------------------
@@ -28,24 +44,24 @@ class ManagementApiClient:
 
     async def login(self, login: str, password: str) -> dict[str, Any]:
         """Login and return raw token data."""
-        url = f"{self.BASE_URL}/login"
-        payload = {
-            "login": login,
-            "parol": password,
-        }
-
-        async with self._session.post(url, json=payload) as resp:
-            resp.raise_for_status()
-            data = await resp.json()
+        data = await self._login_request(
+            method="POST",
+            path="/login",
+            json={
+                "login": login,
+                "parol": password,
+            },
+        )
 
         if not data.get("status"):
-            raise RuntimeError("Login failed")
+            raise login_failed("Login failed", data)
 
         token_data = data.get("data") or {}
 
         return {
             "access_token": token_data.get("access_token"),
             "yandex_token": token_data.get("yandex_"),
+            "expires_in": token_data.get("expires_in"),
         }
 
     # ------------------------------------------------------------------
@@ -58,27 +74,26 @@ class ManagementApiClient:
         yandex_token: str,
         year: int,
     ) -> dict[str, Any]:
-        url = f"{self.BASE_URL}/dashboard"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
-        payload = {
-            "data": yandex_token,
-            "year": year,
-        }
-
-        async with self._session.post(
-            url,
-            json=payload,
-            headers=headers,
-        ) as resp:
-            # ⚠️ endpoint иногда отдаёт text/html
-            data = await resp.json(content_type=None)
+        data = await self._request(
+            method="POST",
+            path="/dashboard",
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            },
+            json={
+                "data": yandex_token,
+                "year": year,
+            },
+            coalesce=True,
+            fresh_for=self.DASHBOARD_FRESH_FOR,
+            # ⚠️ endpoint иногда отдаёт JSON с Content-Type text/html
+            lenient_json=True,
+        )
 
         if not data.get("status"):
-            raise RuntimeError("Dashboard request failed")
+            raise ApiError("Dashboard request failed")
 
         return data.get("data") or {}
 
@@ -89,25 +104,21 @@ class ManagementApiClient:
         year: str,
     ) -> dict[str, Any]:
         """Get accruals for specified year."""
-        url = f"{self.BASE_URL}/nachisleniya"
-        headers = {
-            "Authorization": f"Bearer {token}",
-        }
-        payload = {
-            "data": yandex_token,
-            "year": year,
-        }
-
-        async with self._session.post(
-            url,
-            json=payload,
-            headers=headers,
-        ) as resp:
-            resp.raise_for_status()
-            data = await resp.json()
+        data = await self._request(
+            method="POST",
+            path="/nachisleniya",
+            headers={
+                "Authorization": f"Bearer {token}",
+            },
+            json={
+                "data": yandex_token,
+                "year": year,
+            },
+            coalesce=True,
+        )
 
         if not data.get("status"):
-            raise RuntimeError("Accruals request failed")
+            raise ApiError("Accruals request failed")
 
         return data.get("data") or {}
 
@@ -120,24 +131,21 @@ class ManagementApiClient:
         token: str,
         yandex_token: str,
     ) -> dict[str, Any]:
-        url = f"{self.BASE_URL}/gaz"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
-        payload = {
-            "data": yandex_token,
-        }
-
-        async with self._session.post(
-            url,
-            json=payload,
-            headers=headers,
-        ) as resp:
-            data = await resp.json()
+        data = await self._request(
+            method="POST",
+            path="/gaz",
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            },
+            json={
+                "data": yandex_token,
+            },
+            coalesce=True,
+        )
 
         if not data.get("status"):
-            raise RuntimeError("Gas request failed")
+            raise ApiError("Gas request failed")
 
         return data.get("data") or {}
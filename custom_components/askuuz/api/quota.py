@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from contextvars import ContextVar
+from datetime import date
+from typing import Any
+
+from .errors import ApiError
+
+# учётная запись, от имени которой идут запросы текущей задачи
+# (координатор выставляет на время обновления; дочерние задачи наследуют)
+request_account: ContextVar[str | None] = ContextVar(
+    "askuuz_request_account", default=None
+)
+
+
+class QuotaExceeded(ApiError):
+    """Daily request budget of the account or host is spent."""
+
+
+class RequestBudget:
+    """Daily ceiling on upstream calls per account and per host.
+
+    Считается каждый реальный запрос (включая повторы и логины).
+    Лимит учётной записи — ``per_account`` или свой, заданный в
+    ``track``. Потолок хоста — сумма долей загруженных на нём записей:
+    ``per_host`` на запись со стандартным лимитом, пропорционально
+    больше или меньше при своём. Одна запись может занять до своего
+    лимита. Счётчики сбрасываются при смене даты ``today()``;
+    ``on_change`` вызывается после каждого списания.
+    """
+
+    def __init__(
+        self,
+        *,
+        per_account: int,
+        per_host: int,
+        today: Callable[[], date] = date.today,
+        on_change: Callable[[], None] | None = None,
+    ) -> None:
+        self.per_account = per_account
+        self.per_host = per_host
+        self._today = today
+        self._on_change = on_change
+
+        self._day = today().isoformat()
+        self._accounts: dict[str, int] = {}
+        self._hosts: dict[str, int] = {}
+        # загруженные учётные записи по хостам → их дневной лимит
+        self._members: dict[str, dict[str, int]] = {}
+        self._limits: dict[str, int] = {}
+
+    def track(
+        self,
+        host: str,
+        account: str,
+        limit: int | None = None,
+    ) -> Callable[[], None]:
+        """Count ``account`` towards the ceiling of ``host`` until untracked."""
+        limit = self.per_account if limit is None else limit
+        self._members.setdefault(host, {})[account] = limit
+        self._limits[account] = limit
+
+        def _untrack() -> None:
+            members = self._members.get(host)
+            if members is not None:
+                members.pop(account, None)
+                if not members:
+                    del self._members[host]
+            self._limits.pop(account, None)
+
+        return _untrack
+
+    def account_limit(self, account: str) -> int:
+        return self._limits.get(account, self.per_account)
+
+    def host_limit(self, host: str) -> int:
+        members = self._members.get(host)
+        if not members:
+            return self.per_host
+        return sum(
+            round(self.per_host * limit / self.per_account)
+            for limit in members.values()
+        )
+
+    def _rollover(self) -> None:
+        day = self._today().isoformat()
+        if day != self._day:
+            self._day = day
+            self._accounts.clear()
+            self._hosts.clear()
+
+    def charge(self, host: str) -> None:
+        """Count one call to ``host`` or raise QuotaExceeded."""
+        self._rollover()
+        account = request_account.get()
+
+        if self._hosts.get(host, 0) >= self.host_limit(host):
+            raise QuotaExceeded(f"Daily request budget for {host} exhausted")
+        if (
+            account is not None
+            and self._accounts.get(account, 0) >= self.account_limit(account)
+        ):
+            raise QuotaExceeded(f"Daily request budget for {account} exhausted")
+
+        self._hosts[host] = self._hosts.get(host, 0) + 1
+        if account is not None:
+            self._accounts[account] = self._accounts.get(account, 0) + 1
+
+        if self._on_change is not None:
+            self._on_change()
+
+    def used(self, account: str) -> int:
+        self._rollover()
+        return self._accounts.get(account, 0)
+
+    def left(self, host: str, account: str) -> int:
+        """Calls still allowed today for ``account`` against ``host``."""
+        self._rollover()
+        return max(
+            0,
+            min(
+                self.account_limit(account) - self._accounts.get(account, 0),
+                self.host_limit(host) - self._hosts.get(host, 0),
+            ),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        self._rollover()
+        return {
+            "day": self._day,
+            "accounts": dict(self._accounts),
+            "hosts": dict(self._hosts),
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Load counters saved by ``as_dict`` (ignored if from another day)."""
+        if data.get("day") != self._today().isoformat():
+            return
+        self._day = data["day"]
+        self._accounts = dict(data.get("accounts") or {})
+        self._hosts = dict(data.get("hosts") or {})
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import aiohttp
+
+from .errors import CircuitOpenError, HttpError, RateLimitError, TransientError
+from .limiter import host_limiters
+from .quota import RequestBudget
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter.
+
+    Повторяются только идемпотентные чтения и только после временных
+    ошибок (таймаут, обрыв, 5xx, 429). Ограничение частоты повторяется,
+    только если Retry-After укладывается в ``max_delay``.
+    """
+
+    attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 10.0
+
+    def delay(self, attempt: int) -> float:
+        """Pause before retry number ``attempt`` (1-based)."""
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, cap)
+
+
+DEFAULT_RETRY = RetryPolicy()
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+def is_transient(err: BaseException) -> bool:
+    """True for failures worth retrying (and counted against the host)."""
+    if isinstance(err, CircuitOpenError):
+        return False
+    if isinstance(err, (TransientError, asyncio.TimeoutError)):
+        return True
+    if isinstance(err, aiohttp.ClientResponseError):
+        return err.status >= 500 or err.status == 429
+    return isinstance(err, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError))
+
+
+class CircuitBreaker:
+    """Per-host breaker: closed → open after failures → half-open probe.
+
+    После ``threshold`` временных ошибок подряд хост «открыт»: запросы
+    сразу падают с CircuitOpenError. Через ``cooldown`` секунд пропускается
+    один пробный запрос; успех закрывает цепь, ошибка — снова открывает.
+    """
+
+    def __init__(self, host: str, *, threshold: int, cooldown: float) -> None:
+        self.host = host
+        self._threshold = threshold
+        self._cooldown = cooldown
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or self._now() - self._opened_at >= self._cooldown:
+            return "half_open"
+        return "open"
+
+    @staticmethod
+    def _now() -> float:
+        return asyncio.get_running_loop().time()
+
+    def before(self) -> None:
+        """Admit a call or raise CircuitOpenError."""
+        if self._opened_at is None:
+            return
+        if self._probing or self._now() - self._opened_at < self._cooldown:
+            raise CircuitOpenError(f"Circuit open for {self.host}")
+        self._probing = True
+
+    def success(self) -> None:
+        if self._opened_at is not None:
+            _LOGGER.info("Circuit closed for %s", self.host)
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def failure(self) -> None:
+        self._failures += 1
+        if self._probing or self._failures >= self._threshold:
+            if self._opened_at is None or self._probing:
+                _LOGGER.warning(
+                    "Circuit open for %s after %s failures", self.host, self._failures
+                )
+            self._opened_at = self._now()
+        self._probing = False
+
+    def release(self) -> None:
+        """Call ended without a verdict on the host (quota, cancel, 4xx).
+
+        Пробный слот освобождается, но цепь не закрывается: закрыть её
+        может только ответ хоста (``success``).
+        """
+        self._probing = False
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"state": self.state, "failures": self._failures}
+
+
+class CircuitBreakers:
+    """Registry of breakers keyed by upstream host."""
+
+    def __init__(self, *, threshold: int = 5, cooldown: float = 60.0) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                host, threshold=self.threshold, cooldown=self.cooldown
+            )
+            self._breakers[host] = breaker
+        return breaker
+
+    def as_dict(self) -> dict[str, Any]:
+        return {host: breaker.as_dict() for host, breaker in self._breakers.items()}
+
+
+# один на процесс: общий для всех клиентов и записей
+circuit_breakers = CircuitBreakers()
+
+
+async def resilient_call(
+    host: str,
+    call: Callable[[], Awaitable[T]],
+    *,
+    retry: RetryPolicy = NO_RETRY,
+    budget: RequestBudget | None = None,
+) -> T:
+    """Run ``call`` behind the host breaker and limiter, retrying transient failures.
+
+    Каждая попытка списывается с дневного бюджета ``budget``, если он
+    задан (QuotaExceeded).
+    """
+    breaker = circuit_breakers.get(host)
+    limiter = host_limiters.get(host)
+    attempt = 1
+
+    while True:
+        breaker.before()
+        try:
+            if budget is not None:
+                budget.charge(host)
+            await limiter.acquire()
+        except BaseException:
+            breaker.release()
+            raise
+        try:
+            result = await call()
+        except BaseException as err:
+            if not is_transient(err):
+                limiter.release(None)
+                if isinstance(err, HttpError) and err.status is not None:
+                    # хост ответил (4xx) — он жив
+                    breaker.success()
+                else:
+                    breaker.release()
+                raise
+            limiter.release(False)
+            breaker.failure()
+            if attempt >= retry.attempts:
+                raise
+            delay = retry.delay(attempt)
+            retry_after = getattr(err, "retry_after", None)
+            if isinstance(err, RateLimitError) and retry_after is None:
+                # «Количество попыток…» без срока: не долбим, ждём планировщик
+                raise
+            if retry_after is not None:
+                # сервис сам сказал, когда приходить; слишком долго — сдаёмся
+                if retry_after > retry.max_delay:
+                    raise
+                delay = max(delay, retry_after)
+            _LOGGER.debug(
+                "Retrying %s in %.1fs (attempt %s): %s", host, delay, attempt + 1, err
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+
+        limiter.release(True)
+        breaker.success()
+        return result
+
@@ -3,7 +3,16 @@ from __future__ import annotations
 from typing import Any
 from datetime import datetime
 
-from .base import BaseApiClient, ApiError
+from .base import (
+    ALL_SECTIONS,
+    SECTION_HISTORY,
+    BaseApiClient,
+    ApiError,
+    PeriodCache,
+    cached_period,
+)
+from .errors import login_failed
+from .executor import Step
 
 
 class TboApiClient(BaseApiClient):
@@ -11,12 +20,15 @@ class TboApiClient(BaseApiClient):
 
     Правила:
     - НЕ хранит токены
-    - НЕ делает retry
+    - Повторяет только идемпотентные чтения (см. api/resilience.py)
     - Делает HTTP + парсинг + приведение к канону
     """
 
     BASE_URL = "https://api.tozamakon.eco"
 
+    # список домов общий для всех записей одного логина
+    HOUSES_FRESH_FOR = 60
+
     def __init__(self, session) -> None:
         super().__init__(
             base_url=self.BASE_URL,
@@ -29,7 +41,7 @@ class TboApiClient(BaseApiClient):
     # ------------------------------------------------------------------
 
     async def login(self, *, pid: str, pin: str) -> str:
-        response = await self._request(
+        response = await self._login_request(
             method="POST",
             path="/user-service/mobile/login/confirm-code",
             json={
@@ -44,7 +56,7 @@ class TboApiClient(BaseApiClient):
         try:
             return response["access_token"]
         except (KeyError, TypeError) as exc:
-            raise ApiError("Invalid ASKUT login response") from exc
+            raise login_failed("Invalid ASKUT login response", response) from exc
 
     # ------------------------------------------------------------------
     # HIGH-LEVEL DATA (returns CANONICAL MODEL)
@@ -55,39 +67,108 @@ class TboApiClient(BaseApiClient):
         *,
         token: str,
         account_id: str,
+        cache: PeriodCache | None = None,
+        sections: frozenset[str] = ALL_SECTIONS,
     ) -> dict[str, Any]:
+        """Canonical data; without SECTION_HISTORY only the houses list."""
+        with_history = SECTION_HISTORY in sections
 
         headers = {
             "Authorization": f"Bearer {token}",
         }
 
+        now = datetime.now()
+        current_period = now.strftime("%Y-%m")
+
+        # previous month
+        year = now.year
+        month = now.month - 1
+        if month == 0:
+            month = 12
+            year -= 1
+
+        last_period_iso = f"{year}-{month:02d}"
+        last_period_api = f"{month}.{year}"
+
         # --------------------------------------------------------------
         # HOUSES → find by accountNumber
         # --------------------------------------------------------------
 
-        raw = await self._request(
-            method="GET",
-            path="/user-service/mobile/users/houses",
-            headers=headers,
-        )
+        async def _house(_: dict[str, Any]) -> dict[str, Any]:
+            raw = await self._request(
+                method="GET",
+                path="/user-service/mobile/users/houses",
+                headers=headers,
+                fresh_for=self.HOUSES_FRESH_FOR,
+            )
 
-        try:
-            houses = raw["houses"]
-        except (KeyError, TypeError) as exc:
-            raise ApiError("Invalid ASKUT houses response") from exc
+            try:
+                houses = raw["houses"]
+            except (KeyError, TypeError) as exc:
+                raise ApiError("Invalid ASKUT houses response") from exc
 
-        house = next(
-            (h for h in houses if str(h.get("accountNumber")) == str(account_id)),
-            None,
-        )
+            house = next(
+                (h for h in houses if str(h.get("accountNumber")) == str(account_id)),
+                None,
+            )
+
+            if house is None:
+                raise ApiError(
+                    f"ASKUT house with accountNumber={account_id} not found"
+                )
+
+            return house
 
-        if house is None:
-            raise ApiError(
-                f"ASKUT house with accountNumber={account_id} not found"
+        # --------------------------------------------------------------
+        # PAYMENTS + INCOME STATISTICS (нужен только resident_id)
+        # --------------------------------------------------------------
+
+        async def _payments(inputs: dict[str, Any]) -> Any:
+            return await self._request(
+                method="GET",
+                path=f"/billing-service/payment/resident/{inputs['house']['id']}",
+                params={"sort": "id,desc"},
+                headers=headers,
             )
 
+        async def _stats(inputs: dict[str, Any]) -> dict[str, Any] | None:
+            """Income-statistics row of the last month (closed → cache)."""
+
+            async def _fetch_row() -> dict[str, Any] | None:
+                stats = await self._request(
+                    method="GET",
+                    path=(
+                        "/billing-service/resident-balances/"
+                        f"{inputs['house']['id']}/income-statistics"
+                    ),
+                    headers=headers,
+                )
+
+                try:
+                    return next(
+                        (row for row in stats if row.get("period") == last_period_api),
+                        None,
+                    )
+                except (AttributeError, TypeError):
+                    return None
+
+            return await cached_period(cache, "income_row", last_period_iso, _fetch_row)
+
+        steps = [Step("house", _house)]
+        if with_history:
+            steps += [
+                Step("payments", _payments, requires=("house",)),
+                Step("stats", _stats, requires=("house",)),
+            ]
+
+        try:
+            results = await self._execute(*steps)
+        except (KeyError, TypeError) as exc:
+            raise ApiError("Invalid ASKUT house fields") from exc
+
+        house = results["house"]
+
         try:
-            resident_id = house["id"]
             rate = float(house["rate"])
             people = int(house["inhabitantCount"])
             api_balance = float(house["balance"])
@@ -108,33 +189,31 @@ class TboApiClient(BaseApiClient):
 
         accrual_current = rate * people
 
-        now = datetime.now()
-        current_period = now.strftime("%Y-%m")
+        result: dict[str, Any] = {
+            "account_id": account_id,
+            "current_period": current_period,
 
-        # previous month
-        year = now.year
-        month = now.month - 1
-        if month == 0:
-            month = 12
-            year -= 1
+            "balance": balance,
+            "consumption": people,
+            "accrual": accrual_current,
 
-        last_period_iso = f"{year}-{month:02d}"
-        last_period_api = f"{month}.{year}"
+            "data": {
+                "current_month": {
+                    "consumption": people,
+                    "accrual": accrual_current,
+                },
+            },
+        }
+
+        if not with_history:
+            return result
 
         # --------------------------------------------------------------
         # LAST PAYMENT
         # --------------------------------------------------------------
 
-        last_payment = None
-        payments = await self._request(
-            method="GET",
-            path=f"/billing-service/payment/resident/{resident_id}",
-            params={"sort": "id,desc"},
-            headers=headers,
-        )
-
         try:
-            item = payments["content"][0]
+            item = results["payments"]["content"][0]
             last_payment = {
                 "amount": float(item["amount"]),
                 "date": item["dateTime"][:10],
@@ -148,50 +227,29 @@ class TboApiClient(BaseApiClient):
 
         last_month_accrual = accrual_current
 
-        stats = await self._request(
-            method="GET",
-            path=f"/billing-service/resident-balances/{resident_id}/income-statistics",
-            headers=headers,
-        )
-
-        try:
-            for row in stats:
-                if row.get("period") == last_period_api:
-                    last_month_accrual = float(row["accrual"])
-                    break
-        except (TypeError, ValueError):
-            pass
+        row = results["stats"]
+        if row is not None:
+            try:
+                last_month_accrual = float(row["accrual"])
+            except (KeyError, TypeError, ValueError):
+                pass
 
         # --------------------------------------------------------------
         # FINAL CANONICAL STRUCTURE
         # --------------------------------------------------------------
 
-        return {
-            "account_id": account_id,
-            "current_period": current_period,
-
-            "balance": balance,
+        result["last_payment"] = last_payment
+        result["data"]["last_month"] = {
+            "period": last_period_iso,
             "consumption": people,
-            "accrual": accrual_current,
-
-            "last_payment": last_payment,
-
-            "data": {
-                "current_month": {
-                    "consumption": people,
-                    "accrual": accrual_current,
-                },
-                "last_month": {
-                    "period": last_period_iso,
+            "accrual": last_month_accrual,
+            "tariffs": [
+                {
+                    "tariff": rate,
                     "consumption": people,
                     "accrual": last_month_accrual,
-                    "tariffs": [
-                        {
-                            "tariff": rate,
-                            "consumption": people,
-                            "accrual": last_month_accrual,
-                        }
-                    ],
-                },
-            },
+                }
+            ],
         }
+
+        return result
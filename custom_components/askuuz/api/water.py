@@ -3,7 +3,15 @@ from __future__ import annotations
 from typing import Any
 from datetime import datetime
 
-from .base import BaseApiClient, ApiError
+from .base import (
+    ALL_SECTIONS,
+    SECTION_HISTORY,
+    BaseApiClient,
+    ApiError,
+    PeriodCache,
+    cached_period,
+)
+from .errors import login_failed
 
 
 class WaterApiClient(BaseApiClient):
@@ -11,7 +19,7 @@ class WaterApiClient(BaseApiClient):
 
     Правила:
     - НЕ хранит токены
-    - НЕ делает retry
+    - Повторяет только идемпотентные чтения (см. api/resilience.py)
     - Делает HTTP + парсинг + приведение к канону
     """
 
@@ -34,7 +42,7 @@ class WaterApiClient(BaseApiClient):
         self._pid = pid
         self._pin = pin
 
-        response = await self._request(
+        response = await self._login_request(
             method="POST",
             path="/PIN_AUTH",
             params={"lang": "ru"},
@@ -44,7 +52,71 @@ class WaterApiClient(BaseApiClient):
         try:
             return response["token"]
         except (KeyError, TypeError) as exc:
-            raise ApiError("Invalid PIN_AUTH response") from exc
+            raise login_failed("Invalid PIN_AUTH response", response) from exc
+
+    # ------------------------------------------------------------------
+    # RAW endpoints
+    # ------------------------------------------------------------------
+
+    async def _post(
+        self,
+        token: str,
+        path: str,
+        payload: dict[str, Any],
+    ) -> Any:
+        return await self._request(
+            method="POST",
+            path=path,
+            params={"lang": "ru"},
+            headers={"Token": token},
+            json=payload,
+            coalesce=True,
+        )
+
+    @staticmethod
+    def _last_payment(pay_hst: dict[str, Any]) -> dict[str, Any] | None:
+        if not pay_hst.get("data"):
+            return None
+        p = pay_hst["data"][0]
+        return {
+            "amount": p["psum"] / 100,
+            "date": p["pdt"][:10],
+        }
+
+    @staticmethod
+    def _accruals(
+        sld_hst: list[dict[str, Any]],
+        current_prd_id: int,
+        last_prd_id: int,
+    ) -> tuple[float, float]:
+        current_accrual = 0.0
+        last_accrual = 0.0
+
+        for row in sld_hst:
+            if row.get("prd_id") == current_prd_id:
+                current_accrual = (row["chrg"] + row["corr"]) / 100
+            elif row.get("prd_id") == last_prd_id:
+                last_accrual = (row["chrg"] + row["corr"]) / 100
+
+        return current_accrual, last_accrual
+
+    @staticmethod
+    def _valid_chrg_dtl(chrg_dtl: Any) -> bool:
+        """Real CHRG_DTL (not an empty / error body) — safe to cache forever."""
+        return (
+            isinstance(chrg_dtl, dict)
+            and isinstance(chrg_dtl.get("chrg"), list)
+            and isinstance(chrg_dtl.get("corr"), list)
+        )
+
+    @staticmethod
+    def _consumption(chrg_dtl: dict[str, Any]) -> float:
+        total = 0.0
+        for item in chrg_dtl.get("corr", []):
+            total += float(item.get("om3", 0))
+        for item in chrg_dtl.get("chrg", []):
+            total += float(item.get("om3", 0))
+        return total
 
     # ------------------------------------------------------------------
     # HIGH-LEVEL DATA (returns CANONICAL MODEL)
@@ -55,8 +127,14 @@ class WaterApiClient(BaseApiClient):
         *,
         token: str,
         account_id: str,
+        cache: PeriodCache | None = None,
+        pid: str | None = None,
+        sections: frozenset[str] = ALL_SECTIONS,
     ) -> dict[str, Any]:
-        if not self._pid or not self._pin:
+        """Canonical data; without SECTION_HISTORY only SUB_PRF → balance."""
+        # токен может прийти из общего пула без login() на этом клиенте
+        pid = pid or self._pid
+        if not pid:
             raise ApiError("Water API client not authenticated")
 
         now = datetime.now()
@@ -74,81 +152,67 @@ class WaterApiClient(BaseApiClient):
         last_period = f"{year}-{month:02d}"
 
         # --------------------------------------------------------------
-        # PAY_HST → last_payment
+        # BALANCE ONLY → один дешёвый SUB_PRF
         # --------------------------------------------------------------
 
-        pay_hst = await self._request(
-            method="POST",
-            path="/PAY_HST",
-            params={"lang": "ru"},
-            headers={"Token": token},
-            json={"pid": self._pid},
-        )
-
-        last_payment = None
-        if pay_hst.get("data"):
-            p = pay_hst["data"][0]
-            last_payment = {
-                "amount": p["psum"] / 100,
-                "date": p["pdt"][:10],
+        if SECTION_HISTORY not in sections:
+            sub_prf = await self._post(token, "/SUB_PRF", {})
+            return {
+                "account_id": account_id,
+                "current_period": current_period,
+                "balance": sub_prf.get("sld_sum", 0) / 100,
             }
 
         # --------------------------------------------------------------
-        # SLD_HST → accrual (current + last)
+        # Все запросы независимы (нужен только token) → параллельно.
+        # CHRG_DTL закрытого месяца не меняется → из кеша.
         # --------------------------------------------------------------
 
-        sld_hst = await self._request(
-            method="POST",
-            path="/SLD_HST",
-            params={"lang": "ru"},
-            headers={"Token": token},
-            json={},
+        pay_hst, sld_hst, current_chrg, last_chrg, sub_prf = await self._gather(
+            self._post(token, "/PAY_HST", {"pid": pid}),
+            self._post(token, "/SLD_HST", {}),
+            self._post(token, "/CHRG_DTL", {"prd_id": current_prd_id}),
+            cached_period(
+                cache,
+                "chrg_dtl",
+                last_period,
+                lambda: self._post(token, "/CHRG_DTL", {"prd_id": last_prd_id}),
+                valid=self._valid_chrg_dtl,
+            ),
+            self._post(token, "/SUB_PRF", {}),
         )
 
-        current_accrual = 0.0
-        last_accrual = 0.0
+        # --------------------------------------------------------------
+        # PAY_HST → last_payment
+        # --------------------------------------------------------------
 
-        for row in sld_hst:
-            if row.get("prd_id") == current_prd_id:
-                current_accrual = (row["chrg"] + row["corr"]) / 100
-            elif row.get("prd_id") == last_prd_id:
-                last_accrual = (row["chrg"] + row["corr"]) / 100
+        last_payment = self._memo.get(
+            "pay_hst", pay_hst, None, lambda: self._last_payment(pay_hst)
+        )
+
+        # --------------------------------------------------------------
+        # SLD_HST → accrual (current + last)
+        # --------------------------------------------------------------
+
+        # длинная история: неизменившийся ответ не разбираем повторно
+        current_accrual, last_accrual = self._memo.get(
+            "sld_hst",
+            sld_hst,
+            (current_prd_id, last_prd_id),
+            lambda: self._accruals(sld_hst, current_prd_id, last_prd_id),
+        )
 
         # --------------------------------------------------------------
         # CHRG_DTL → consumption (current + last)
         # --------------------------------------------------------------
 
-        async def _get_consumption(prd_id: int) -> float:
-            resp = await self._request(
-                method="POST",
-                path="/CHRG_DTL",
-                params={"lang": "ru"},
-                headers={"Token": token},
-                json={"prd_id": prd_id},
-            )
-
-            total = 0.0
-            for item in resp.get("corr", []):
-                total += float(item.get("om3", 0))
-            for item in resp.get("chrg", []):
-                total += float(item.get("om3", 0))
-            return total
-
-        current_consumption = await _get_consumption(current_prd_id)
-        last_consumption = await _get_consumption(last_prd_id)
+        current_consumption = self._consumption(current_chrg)
+        last_consumption = self._consumption(last_chrg)
 
         # --------------------------------------------------------------
         # SUB_PRF → tariff + balance
         # --------------------------------------------------------------
 
-        sub_prf = await self._request(
-            method="POST",
-            path="/SUB_PRF",
-            params={"lang": "ru"},
-            headers={"Token": token},
-            json={},
-        )
-
         tariff = sub_prf.get("rtpl_sum")
 
         # --------------------------------------------------------------
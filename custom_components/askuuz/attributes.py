@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Any
+
+# ключи данных, из которых строятся атрибуты сенсора баланса
+BALANCE_ATTR_KEYS = (
+    "account_id",
+    "current_period",
+    "balance",
+    "consumption",
+    "accrual",
+    "last_payment",
+)
+
+
+def balance_attributes(data: dict[str, Any] | None) -> dict[str, Any]:
+    """Small scalar attributes of a balance sensor.
+
+    Вложенные разделы (``data``, история, газ) в атрибуты не попадают —
+    recorder сохранял бы их при каждом изменении состояния. Полные данные
+    отдаёт сервис ``askuuz.get_data``.
+    """
+    data = data or {}
+    last_payment = data.get("last_payment") or {}
+
+    return {
+        "account_id": data.get("account_id"),
+        "current_period": data.get("current_period"),
+        "balance": data.get("balance"),
+        "consumption": data.get("consumption"),
+        "accrual": data.get("accrual"),
+        "last_payment_amount": last_payment.get("amount"),
+        "last_payment_date": last_payment.get("date"),
+    }
@@ -1,26 +1,86 @@
 from __future__ import annotations
 
+import calendar
 import logging
-from datetime import timedelta
-from typing import Any
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.util import dt as dt_util
+
+from .api.base import (
+    ALL_SECTIONS,
+    SECTION_BALANCE,
+    SECTION_HISTORY,
+    AuthError,
+    RateLimitError,
+)
+from .api.quota import QuotaExceeded, RequestBudget, request_account
+from .const import CONF_REQUEST_BUDGET, DOMAIN
+from .period_cache import PeriodScope, async_get_period_cache
+from .request_budget import async_get_request_budget
+from .host_sessions import get_host_sessions, url_host
+from .login_governor import LoginBlocked, get_login_governor, is_rejection
+from .token_pool import AuthToken, TokenPool, async_get_token_pool, token_key
+
+if TYPE_CHECKING:
+    from .scheduler import RefreshScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
 UPDATE_INTERVAL = timedelta(hours=12)
-TOKEN_TTL = 60 * 60 * 12  # если API не даёт expires
+
+# Разделы данных обновляются с разной частотой: дешёвый баланс — каждый
+# тик планировщика, тяжёлая история — по адаптивному интервалу ниже.
+BALANCE_INTERVAL = timedelta(hours=1)
+
+# Адаптивный опрос истории: данные меняются всплесками вокруг смены
+# периода и после платежей/начислений, в середине месяца — почти никогда.
+POLL_DENSE = timedelta(hours=2)     # смена периода / замечено изменение
+POLL_SPARSE = timedelta(hours=24)   # середина расчётного цикла
+ROLLOVER_DAYS = 3                   # первые дни месяца (+ последний день)
+POSTING_DAYS = 10                   # до этого дня ещё идут начисления
+CHANGE_BOOST = timedelta(hours=24)  # густой опрос после изменения
+WATCHED_KEYS = ("current_period", "balance", "accrual", "last_payment")
+
+# дневной бюджет запросов: когда остаётся меньше — только баланс
+HISTORY_RESERVE = 20
+
+TOKEN_TTL = 60 * 60 * 12  # если ни JWT, ни API не дают срок жизни
+
+# контекст слушателей, которым нужен каждый завершённый опрос
+# (счётчики запросов), даже если данные не изменились
+CONTEXT_REQUESTS = "_requests"
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 10
+
+
+def _snapshot_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Last successful canonical data of one entry."""
+    return Store(hass, SNAPSHOT_VERSION, f"{DOMAIN}.snapshot.{entry_id}")
+
+
+async def async_remove_snapshot(hass: HomeAssistant, entry_id: str) -> None:
+    await _snapshot_store(hass, entry_id).async_remove()
 
 
 class BaseASKUCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Canonical ASKU coordinator."""
 
+    # "electricity" / "water" / "tbo" / "management"
+    SERVICE: str
+    # класс API-клиента (его BASE_URL задаёт upstream-хост)
+    API_CLIENT: type
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -39,19 +99,61 @@ class BaseASKUCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         self._account_id = account_id
         self._options = options or {}
 
-        self._session = async_get_clientsession(hass)
+        # свой пул соединений на хост; отпускается в async_shutdown
+        self.upstream_host = url_host(self.API_CLIENT.BASE_URL)
+        self._session = get_host_sessions(hass).acquire(self.upstream_host)
         self._api = self._create_api_client(self._session)
 
         self._token: str | None = None
         self._token_expires_at: float | None = None
 
+        # токены общие для всех записей с одинаковым логином
+        # (пул загружается с диска при первом обновлении)
+        self._token_pool: TokenPool | None = None
+        self._token_key = token_key(self.SERVICE, username, password)
+        self._unregister_token_refresh: CALLBACK_TYPE | None = None
+
         self._last_success_data: dict[str, Any] | None = None
+        # растёт только при реальном изменении канонических данных
+        self.data_version = 0
+        # что последний раз видели слушатели (для маршрутизации по ключам)
+        self._dispatched: dict[str, Any] | None = None
+        self._dispatched_success = True
+        # последнее обновление отдало прошлые данные из-за ошибки API
+        self.stale = False
+        self.stale_reason: str | None = None
+
+        # последний успешный снапшот на диске → мгновенный старт
+        self._snapshot_store = _snapshot_store(hass, entry_id)
+        self._snapshot_saved_at: float | None = None
+
+        # до какого момента опрашиваем часто после замеченного изменения
+        self._boost_until: datetime | None = None
+        # когда последний раз обновлялся раздел истории (wall clock)
+        self._history_at: float | None = None
+        # ручное обновление (кнопка / сервис) → все разделы
+        self._force_full = False
+
+        # закрытые расчётные периоды (загружается при первом обновлении)
+        self._period_cache: PeriodScope | None = None
+
+        # дневной бюджет запросов (загружается при первом обновлении)
+        self._budget: RequestBudget | None = None
+        self._untrack_budget: Callable[[], None] | None = None
+        self.budget_account = f"{self.SERVICE}:{account_id}"
+
+        # тики задаёт общий планировщик (scheduler.py), а не свой таймер
+        self.poll_interval = BALANCE_INTERVAL
+        self.scheduler: RefreshScheduler | None = None
 
         super().__init__(
             hass,
             _LOGGER,
             name=f"asku_{self._account_id}",
-            update_interval=UPDATE_INTERVAL,
+            update_interval=None,
+            # те же данные (в т.ч. fallback на прошлые) → сущности не трогаем;
+            # смена доступности уведомляет всегда
+            always_update=False,
         )
 
     # ---------------------------------------------------------------------
@@ -60,41 +162,139 @@ class BaseASKUCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
     def _create_api_client(self, session):
         """Return service-specific ApiClient."""
-        raise NotImplementedError
-
-    def _token_valid(self) -> bool:
-        return (
-            self._token is not None
-            and self._token_expires_at is not None
-            and self.hass.loop.time() < self._token_expires_at
-        )
+        return self.API_CLIENT(session=session)
 
     def _reset_token(self) -> None:
         self._token = None
         self._token_expires_at = None
 
-    async def _login(self) -> None:
-        """Service-specific login. MUST set token + expires."""
+    def _apply_token(self, token: AuthToken) -> None:
+        """Take a pooled token. Override to read service-specific extras."""
+        self._token = token.value
+        self._token_expires_at = token.expires_at
+
+    async def _async_acquire_token(self) -> None:
+        """Get the shared token; logs in only if nobody has a valid one."""
+        if self._token_pool is None:
+            self._token_pool = await async_get_token_pool(self.hass)
+            # пул сам обновляет токен заранее, пока запись загружена
+            self._unregister_token_refresh = self._token_pool.async_register(
+                self._token_key, self._login, self._next_poll
+            )
+
+        token = await self._token_pool.async_get(self._token_key, self._login)
+        self._apply_token(token)
+
+    def _next_poll(self) -> float | None:
+        """Seconds until this entry polls the API again (None — unknown)."""
+        if self.scheduler is None:
+            return None
+        return self.scheduler.next_poll(self.entry_id)
+
+    def _invalidate_token(self) -> None:
+        """Drop the current token for every entry that shares it."""
+        if self._token_pool is not None:
+            self._token_pool.invalidate(self._token_key, self._token)
+        self._reset_token()
+
+    @staticmethod
+    async def login_token(api, username: str, password: str) -> AuthToken:
+        """Service-specific login. MUST return token + expires.
+
+        Срок жизни берите через ``token_expiry`` (JWT exp / expires_in),
+        TOKEN_TTL — только запасной вариант. Используется и config flow,
+        чтобы проверенный токен сразу попал в общий пул.
+        """
         raise NotImplementedError
 
+    async def _login(self) -> AuthToken:
+        """Login through the governor: rejection → reauth, network → retry later."""
+        try:
+            return await get_login_governor(self.hass).async_login(
+                self.SERVICE,
+                self._username,
+                self._password,
+                lambda: self.login_token(self._api, self._username, self._password),
+            )
+        except LoginBlocked as err:
+            # пароль уже отвергнут / бюджет попыток исчерпан
+            raise ConfigEntryAuthFailed(f"Login blocked: {err.reason}") from err
+        except Exception as err:
+            if is_rejection(err):
+                # неверный логин / пароль
+                raise ConfigEntryAuthFailed from err
+            raise UpdateFailed(f"Login failed: {err}") from err
+
+    async def async_shutdown(self) -> None:
+        """Stop background token refresh, leave the budget, release the session."""
+        if self._unregister_token_refresh is not None:
+            self._unregister_token_refresh()
+            self._unregister_token_refresh = None
+        if self._untrack_budget is not None:
+            self._untrack_budget()
+            self._untrack_budget = None
+        await super().async_shutdown()
+        if self._session is not None:
+            self._session = None
+            await get_host_sessions(self.hass).async_release(self.upstream_host)
+
     # ---------------------------------------------------------------------
     # Update flow (ЕДИНСТВЕННЫЙ вход)
     # ---------------------------------------------------------------------
 
     async def _async_update_data(self) -> dict[str, Any]:
+        # все запросы этого обновления списываются с бюджета записи
+        context = request_account.set(self.budget_account)
         try:
-            if not self._token_valid():
-                await self._login()
+            return await self._async_update_sections()
+        finally:
+            request_account.reset(context)
+            # после того как HA применит результат
+            self.hass.loop.call_soon(self._async_update_context, CONTEXT_REQUESTS)
+
+    async def _async_update_sections(self) -> dict[str, Any]:
+        try:
+            if self._period_cache is None:
+                cache = await async_get_period_cache(self.hass)
+                self._period_cache = cache.scope(self.SERVICE, self._account_id)
+            if self._budget is None:
+                self._budget = await async_get_request_budget(self.hass)
+                self._api.budget = self._budget
+                self._untrack_budget = self._budget.track(
+                    self.upstream_host,
+                    self.budget_account,
+                    self._options.get(CONF_REQUEST_BUDGET),
+                )
+
+            sections = self._budget_sections(self._sections_due())
+            self._force_full = False
+
+            # токен мог смениться другой записью → всегда сверяемся с пулом
+            await self._async_acquire_token()
 
             try:
-                data = await self._fetch_data()
-            except PermissionError:
-                # 401 / 403
-                self._reset_token()
-                await self._login()
-                data = await self._fetch_data()
-
-            self._last_success_data = data
+                partial = await self._fetch_data(sections)
+            except AuthError:
+                # 401 / 403 — токен отозван раньше срока
+                self._invalidate_token()
+                await self._async_acquire_token()
+                partial = await self._fetch_data(sections)
+
+            data = self._merge_sections(self._last_success_data, partial)
+            if SECTION_HISTORY in sections:
+                self._history_at = time.time()
+
+            self._track_changes(self._last_success_data, data)
+            if data == self._last_success_data:
+                # тот же объект → DataUpdateCoordinator сравнит за O(1)
+                data = self._last_success_data
+            else:
+                self.data_version += 1
+                self._last_success_data = data
+            # снапшот — всегда: saved_at решает, свежий ли он после рестарта
+            self._save_snapshot(data)
+            self.stale = False
+            self.stale_reason = None
             return data
 
         except ConfigEntryAuthFailed:
@@ -102,17 +302,224 @@ class BaseASKUCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             raise
 
         except Exception as err:
-            _LOGGER.warning("Coordinator update failed: %s", err)
+            if isinstance(err, RateLimitError):
+                # сервис просит подождать: relogin не поможет, повторит планировщик
+                _LOGGER.warning(
+                    "Rate limited by %s (retry after %s s)",
+                    self.upstream_host,
+                    err.retry_after,
+                )
+            else:
+                _LOGGER.warning("Coordinator update failed: %s", err)
             if self._last_success_data is not None:
+                self.stale = True
+                self.stale_reason = str(err)
                 return self._last_success_data
             raise UpdateFailed(err) from err
 
+    # ---------------------------------------------------------------------
+    # Listener routing (только сущности изменившихся ключей)
+    # ---------------------------------------------------------------------
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify listeners whose context keys changed since the last dispatch.
+
+        Контекст слушателя — кортеж ключей верхнего уровня (``"gas"`` —
+        всё поддерево газа). Без контекста — всегда; при смене
+        доступности — все.
+        """
+        previous, self._dispatched = self._dispatched, self.data
+        available_changed = self._dispatched_success != self.last_update_success
+        self._dispatched_success = self.last_update_success
+
+        if (
+            previous is None
+            or available_changed
+            or not isinstance(self.data, dict)
+        ):
+            super().async_update_listeners()
+            return
+
+        changed = {
+            key
+            for key in previous.keys() | self.data.keys()
+            if previous.get(key) != self.data.get(key)
+        }
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or changed.intersection(context):
+                update_callback()
+
+    @callback
+    def _async_update_context(self, key: str) -> None:
+        """Notify only listeners bound to ``key``."""
+        for update_callback, context in list(self._listeners.values()):
+            if context is not None and key in context:
+                update_callback()
+
+    async def async_request_refresh(self) -> None:
+        """Manual refresh (button / service) fetches every section.
+
+        Через планировщик: обгоняет плановые обновления, но соблюдает
+        лимит одновременных запросов к хосту.
+        """
+        self._force_full = True
+        if self.scheduler is None:
+            await super().async_request_refresh()
+            return
+        await self.scheduler.async_request(self)
+
+    # ---------------------------------------------------------------------
+    # Sections (multi-cadence polling)
+    # ---------------------------------------------------------------------
+
+    @property
+    def budget_used(self) -> int | None:
+        return None if self._budget is None else self._budget.used(self.budget_account)
+
+    @property
+    def budget_left(self) -> int | None:
+        if self._budget is None:
+            return None
+        return self._budget.left(self.upstream_host, self.budget_account)
+
+    def _budget_sections(self, sections: frozenset[str]) -> frozenset[str]:
+        """Defer when the daily budget is spent, balance only when it is low."""
+        left = self.budget_left
+        if left is None:
+            return sections
+
+        if left <= 0:
+            raise QuotaExceeded(f"Daily request budget of {self.budget_account} exhausted")
+
+        if SECTION_HISTORY in sections and left < HISTORY_RESERVE:
+            _LOGGER.info(
+                "Request budget low for %s (%s left): balance only",
+                self.budget_account,
+                left,
+            )
+            return frozenset({SECTION_BALANCE})
+
+        return sections
+
+    def _sections_due(self) -> frozenset[str]:
+        """Balance on every tick; history when due or on period change."""
+        if self._force_full or self._last_success_data is None or self._history_at is None:
+            return ALL_SECTIONS
+
+        now = dt_util.now()
+        history_at = dt_util.as_local(dt_util.utc_from_timestamp(self._history_at))
+
+        if (
+            history_at.strftime("%Y-%m") != now.strftime("%Y-%m")
+            or now - history_at >= self._history_interval()
+        ):
+            return ALL_SECTIONS
+
+        return frozenset({SECTION_BALANCE})
+
+    @staticmethod
+    def _merge_sections(
+        previous: dict[str, Any] | None,
+        partial: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Overlay fetched sections on the previous canonical data."""
+        merged = dict(previous or {})
+
+        for key, value in partial.items():
+            if key == "data" and isinstance(value, dict):
+                merged["data"] = {**(merged.get("data") or {}), **value}
+            else:
+                merged[key] = value
+
+        return merged
+
+    # ---------------------------------------------------------------------
+    # Adaptive history interval (billing calendar + observed changes)
+    # ---------------------------------------------------------------------
+
+    def _track_changes(
+        self,
+        previous: dict[str, Any] | None,
+        data: dict[str, Any],
+    ) -> None:
+        """Refresh history densely for a while after balance/period changes."""
+        if previous is None:
+            return
+
+        changed = [key for key in WATCHED_KEYS if previous.get(key) != data.get(key)]
+        if changed:
+            _LOGGER.debug("%s: %s changed, refreshing history densely", self.name, changed)
+            self._boost_until = dt_util.now() + CHANGE_BOOST
+
+    def _history_interval(self) -> timedelta:
+        now = dt_util.now()
+
+        if self._boost_until is not None and now < self._boost_until:
+            return POLL_DENSE
+
+        days_in_month = calendar.monthrange(now.year, now.month)[1]
+        if now.day <= ROLLOVER_DAYS or now.day == days_in_month:
+            return POLL_DENSE
+
+        interval = UPDATE_INTERVAL if now.day <= POSTING_DAYS else POLL_SPARSE
+
+        # не перепрыгиваем через начало окна смены периода
+        next_rollover = (now.replace(day=1) + timedelta(days=32)).replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        ) - timedelta(days=1)
+        return max(min(interval, next_rollover - now), POLL_DENSE)
+
+    # ---------------------------------------------------------------------
+    # Persisted snapshot (stale-while-revalidate)
+    # ---------------------------------------------------------------------
+
+    async def async_restore_snapshot(self) -> bool:
+        """Load the last persisted data; True if entities can start from it."""
+        stored = await self._snapshot_store.async_load()
+        if not stored or not isinstance(stored.get("data"), dict):
+            return False
+
+        self.data = stored["data"]
+        self._last_success_data = stored["data"]
+        self._snapshot_saved_at = stored.get("saved_at")
+        self._history_at = stored.get("history_at")
+        return True
+
+    @property
+    def account_id(self) -> str:
+        return self._account_id
+
+    @property
+    def snapshot_fresh(self) -> bool:
+        """True if the restored snapshot is younger than one poll interval."""
+        return (
+            self._snapshot_saved_at is not None
+            and time.time() - self._snapshot_saved_at
+            < self.poll_interval.total_seconds()
+        )
+
+    def _save_snapshot(self, data: dict[str, Any]) -> None:
+        self._snapshot_saved_at = time.time()
+        self._snapshot_store.async_delay_save(
+            lambda: {
+                "saved_at": self._snapshot_saved_at,
+                "history_at": self._history_at,
+                "data": data,
+            },
+            SNAPSHOT_SAVE_DELAY,
+        )
+
     # ---------------------------------------------------------------------
     # Fetch & normalize
     # ---------------------------------------------------------------------
 
-    async def _fetch_data(self) -> dict[str, Any]:
-        """Fetch RAW data from API. No normalization here."""
+    async def _fetch_data(self, sections: frozenset[str]) -> dict[str, Any]:
+        """Fetch canonical data of ``sections``.
+
+        Без SECTION_HISTORY возвращается только часть канона (баланс и
+        текущий месяц); остальное берётся из прошлых данных.
+        """
         raise NotImplementedError
 
     # ---------------------------------------------------------------------
@@ -3,16 +3,31 @@ from __future__ import annotations
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.helpers.selector import SelectSelector, SelectSelectorConfig
 from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN
+from .const import CONF_REQUEST_BUDGET, DOMAIN, REQUEST_BUDGET_PER_ACCOUNT
 from .api.electricity import ElectricityApiClient
 from .api.water import WaterApiClient
 from .api.tbo import TboApiClient
 from .api.management import ManagementApiClient
-from .api.base import AuthError, ApiError
+from .api.errors import RateLimitError
+from .electricity.coordinator import ElectricityDataUpdateCoordinator
+from .water.coordinator import WaterDataUpdateCoordinator
+from .tbo.coordinator import TboDataUpdateCoordinator
+from .management.coordinator import ManagementDataUpdateCoordinator
+from .host_sessions import get_host_sessions, url_host
+from .login_governor import LoginBlocked, get_login_governor, is_rejection
+from .token_pool import async_get_token_pool, token_key
+
+# service → (API client, coordinator с login_token)
+SERVICES = {
+    "electricity": (ElectricityApiClient, ElectricityDataUpdateCoordinator),
+    "water": (WaterApiClient, WaterDataUpdateCoordinator),
+    "tbo": (TboApiClient, TboDataUpdateCoordinator),
+    "management": (ManagementApiClient, ManagementDataUpdateCoordinator),
+}
 
 
 class ASKUUZConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -22,50 +37,47 @@ class ASKUUZConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._service: str | None = None
         self._data: dict = {}
 
-    async def _validate_credentials(self, username: str, password: str, service: str) -> bool:
-        """Validate credentials by attempting to login."""
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return ASKUUZOptionsFlow()
+
+    async def _validate_credentials(self, username: str, password: str, service: str) -> str | None:
+        """Validate credentials by attempting to login; return an error key.
+
+        Логин идёт через общий governor: уже отвергнутый пароль не
+        отправляется повторно, число отказов ограничено. Полученный токен
+        не выбрасывается: он кладётся в общий пул, и первое обновление
+        новой записи обходится без второго логина.
+        """
+        api_cls, coordinator_cls = SERVICES[service]
+        host = url_host(api_cls.BASE_URL)
+        sessions = get_host_sessions(self.hass)
+        session = sessions.acquire(host)
+
         try:
-            session = async_get_clientsession(self.hass)
-            
-            # Create appropriate API client based on service type
-            if service == "electricity":
-                api = ElectricityApiClient(session=session)
-                response = await api._request(
-                    method="POST",
-                    path="/user-login",
-                    json={
-                        "login": username,
-                        "password": password,
-                    },
-                    headers={
-                        "Accept": "application/json, text/plain, */*",
-                        "Content-Type": "application/json",
-                    },
-                )
-                # Check if token exists in response
-                return "data" in response and "accessToken" in response.get("data", {})
-            
-            elif service == "water":
-                api = WaterApiClient(session=session)
-                token = await api.login(pid=username, pin=password)
-                return token is not None and isinstance(token, str) and len(token) > 0
-            
-            elif service == "tbo":
-                api = TboApiClient(session=session)
-                token = await api.login(pid=username, pin=password)
-                return token is not None and isinstance(token, str) and len(token) > 0
-            
-            elif service == "management":
-                api = ManagementApiClient(session=session)
-                result = await api.login(username, password)
-                return "access_token" in result and "yandex_token" in result
-        
-        except AuthError:
-            return False
-        except ApiError:
-            return False
-        except Exception:
-            return False
+            token = await get_login_governor(self.hass).async_login(
+                service,
+                username,
+                password,
+                lambda: coordinator_cls.login_token(api_cls(session), username, password),
+            )
+        except LoginBlocked as err:
+            return err.reason
+        except RateLimitError:
+            # провайдер сам ограничил попытки входа
+            return "too_many_attempts"
+        except Exception as err:
+            return "invalid_auth" if is_rejection(err) else "cannot_connect"
+        finally:
+            await sessions.async_release(host)
+
+        if not isinstance(token.value, str) or not token.value:
+            return "invalid_auth"
+
+        pool = await async_get_token_pool(self.hass)
+        pool.seed(token_key(service, username, password), token)
+        return None
 
     async def async_step_user(self, user_input=None):
         errors = {}
@@ -102,6 +114,8 @@ class ASKUUZConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             if self._service == "management":
                 schema[vol.Optional("enable_gas", default=False)] = cv.boolean
+            if self._service == "electricity":
+                schema[vol.Optional("tariff_history", default=False)] = cv.boolean
 
             return self.async_show_form(
                 step_id="credentials",
@@ -120,6 +134,8 @@ class ASKUUZConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             if self._service == "management":
                 schema[vol.Optional("enable_gas", default=False)] = cv.boolean
+            if self._service == "electricity":
+                schema[vol.Optional("tariff_history", default=False)] = cv.boolean
 
             return self.async_show_form(
                 step_id="credentials",
@@ -128,12 +144,13 @@ class ASKUUZConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             )
 
         # Validate credentials by attempting to login
-        if not await self._validate_credentials(
+        error = await self._validate_credentials(
             user_input["username"],
             user_input["password"],
             self._service
-        ):
-            errors["base"] = "invalid_auth"
+        )
+        if error is not None:
+            errors["base"] = error
             schema = {
                 vol.Required("username", description={"suggested_value": user_input["username"]}): str,
                 vol.Required("password"): str,
@@ -142,6 +159,8 @@ class ASKUUZConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             if self._service == "management":
                 schema[vol.Optional("enable_gas", default=user_input.get("enable_gas", False))] = cv.boolean
+            if self._service == "electricity":
+                schema[vol.Optional("tariff_history", default=user_input.get("tariff_history", False))] = cv.boolean
 
             return self.async_show_form(
                 step_id="credentials",
@@ -156,6 +175,9 @@ class ASKUUZConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             "account_id": user_input["account_id"],
         }
 
+        if self._service == "electricity":
+            self._data["tariff_history"] = user_input.get("tariff_history", False)
+
         # Check if configuration with same service, username, and account_id already exists
         for entry in self.hass.config_entries.async_entries(DOMAIN):
             if (
@@ -172,6 +194,8 @@ class ASKUUZConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
                 if self._service == "management":
                     schema[vol.Optional("enable_gas", default=user_input.get("enable_gas", False))] = cv.boolean
+                if self._service == "electricity":
+                    schema[vol.Optional("tariff_history", default=user_input.get("tariff_history", False))] = cv.boolean
 
                 return self.async_show_form(
                     step_id="credentials",
@@ -219,3 +243,25 @@ class ASKUUZConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             title=f"ASKU {data['service'].capitalize()} {data['account_id']}",
             data=data,
         )
+
+
+class ASKUUZOptionsFlow(config_entries.OptionsFlow):
+    """Per-entry options: daily upstream request budget."""
+
+    async def async_step_init(self, user_input=None):
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_REQUEST_BUDGET,
+                        default=self.config_entry.options.get(
+                            CONF_REQUEST_BUDGET, REQUEST_BUDGET_PER_ACCOUNT
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=20, max=10000)),
+                }
+            ),
+        )
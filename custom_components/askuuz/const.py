@@ -10,3 +10,20 @@ class UtilityType(StrEnum):
     GAS = "gas"
     MANAGEMENT = "management"
     GARBAGE = "garbage"
+
+# hass.data keys for integration-wide singletons
+# (hass.data[DOMAIN] содержит только координаторы по entry_id)
+DATA_PERIOD_CACHE = f"{DOMAIN}_period_cache"
+DATA_TOKEN_POOL = f"{DOMAIN}_token_pool"
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+DATA_LOGIN_GOVERNOR = f"{DOMAIN}_login_governor"
+DATA_REQUEST_BUDGET = f"{DOMAIN}_request_budget"
+DATA_HOST_SESSIONS = f"{DOMAIN}_host_sessions"
+
+# дневной бюджет запросов к upstream: на учётную запись (по умолчанию;
+# меняется в параметрах записи) и на хост (потолок хоста —
+# REQUEST_BUDGET_PER_HOST на каждую запись этого хоста со стандартным
+# лимитом; вода в дни смены периода — ~72 запроса на запись в сутки)
+REQUEST_BUDGET_PER_ACCOUNT = 500
+REQUEST_BUDGET_PER_HOST = 150
+CONF_REQUEST_BUDGET = "request_budget"
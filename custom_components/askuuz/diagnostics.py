@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .api.limiter import host_limiters
+from .api.resilience import circuit_breakers
+from .const import DOMAIN
+from .request_budget import async_get_request_budget
+
+TO_REDACT = {"username", "password", "account_id", "gas_account_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Diagnostics: entry state plus shared per-host throttling state."""
+    coordinator = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    request_budget = await async_get_request_budget(hass)
+
+    diagnostics: dict[str, Any] = {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        # общие для всех записей: лимиты и circuit breaker по хостам
+        "limiters": host_limiters.as_dict(),
+        "circuit_breakers": circuit_breakers.as_dict(),
+        # по записям — без номеров счетов, только по хостам
+        "request_budget": {
+            key: value
+            for key, value in request_budget.as_dict().items()
+            if key != "accounts"
+        },
+    }
+
+    if coordinator is not None:
+        diagnostics["coordinator"] = {
+            "service": coordinator.SERVICE,
+            "upstream_host": coordinator.upstream_host,
+            "last_update_success": coordinator.last_update_success,
+            "stale": coordinator.stale,
+            "stale_reason": coordinator.stale_reason,
+            "poll_interval": coordinator.poll_interval.total_seconds(),
+            "data_keys": sorted(coordinator.data or {}),
+            # сколько раз данные реально менялись с загрузки записи
+            "data_version": coordinator.data_version,
+            "requests_today": coordinator.budget_used,
+            "request_budget_left": coordinator.budget_left,
+        }
+
+    return diagnostics
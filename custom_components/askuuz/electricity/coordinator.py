@@ -4,11 +4,11 @@ import logging
 from typing import Any
 
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed
 
 from ..base_coordinator import BaseASKUCoordinator, TOKEN_TTL
+from ..token_pool import AuthToken, token_expiry
 from ..api.electricity import ElectricityApiClient
-from ..api.base import ApiError
+from ..api.errors import login_failed
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,55 +16,37 @@ _LOGGER = logging.getLogger(__name__)
 class ElectricityDataUpdateCoordinator(BaseASKUCoordinator):
     """ASKU Electricity coordinator."""
 
+    SERVICE = "electricity"
+    API_CLIENT = ElectricityApiClient
+
     # ------------------------------------------------------------------
     # Base coordinator implementation
     # ------------------------------------------------------------------
 
-    def _create_api_client(self, session) -> ElectricityApiClient:
-        return ElectricityApiClient(session=session)
-
-    async def _login(self) -> None:
-        try:
-            response = await self._api._request(
-                method="POST",
-                path="/user-login",
-                json={
-                    "login": self._username,
-                    "password": self._password,
-                },
-                headers={
-                    "Accept": "application/json, text/plain, */*",
-                    "Content-Type": "application/json",
-                },
-            )
-        except Exception as err:
-            raise ConfigEntryAuthFailed from err
+    @staticmethod
+    async def login_token(
+        api: ElectricityApiClient, username: str, password: str
+    ) -> AuthToken:
+        response = await api.login(login=username, password=password)
 
         try:
-            self._token = response["data"]["accessToken"]
-            self._token_expires_at = self.hass.loop.time() + TOKEN_TTL
+            value = response["data"]["accessToken"]
         except (KeyError, TypeError) as exc:
-            raise ConfigEntryAuthFailed from exc
+            raise login_failed("Invalid electricity login response", response) from exc
 
-    async def _fetch_data(self) -> dict[str, Any]:
-        assert self._token is not None
+        return AuthToken(
+            value=value,
+            expires_at=token_expiry(value, response, default_ttl=TOKEN_TTL),
+        )
 
-        try:
-            data = await self._api.get_data(
-                token=self._token,
-                account_id=self._account_id,
-            )
-            return data
-
-        except ApiError as err:
-            message = str(err)
-
-            # 401 / 403 → проброс для retry в BaseASKUCoordinator
-            if "401" in message or "403" in message:
-                raise PermissionError from err
-
-            # Rate limit → fallback handled в base
-            if "Количество попыток закончилось" in message:
-                raise err
+    async def _fetch_data(self, sections: frozenset[str]) -> dict[str, Any]:
+        assert self._token is not None
 
-            raise err
+        # 401 / 403 (AuthError) → relogin и повтор в BaseASKUCoordinator
+        return await self._api.get_data(
+            token=self._token,
+            account_id=self._account_id,
+            cache=self._period_cache,
+            sections=sections,
+            tariff_history=self._options.get("tariff_history", False),
+        )
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import logging
+from urllib.parse import urlparse
+
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util.ssl import get_default_context
+
+from .const import DATA_HOST_SESSIONS
+
+_LOGGER = logging.getLogger(__name__)
+
+LIMIT_PER_HOST = 8     # соединений к одному сервису
+DNS_CACHE_TTL = 300    # секунд
+KEEPALIVE = 60         # секунд простоя до закрытия соединения
+
+
+def url_host(url: str) -> str:
+    return urlparse(url).hostname or ""
+
+
+class HostSessions:
+    """Refcounted ClientSession per upstream host.
+
+    У каждого хоста свой TCPConnector: keep-alive, кеш DNS, лимит
+    соединений и общий SSL-контекст (переиспользование TLS-сессий).
+    Сессия закрывается, когда её отпускает последняя запись (или при
+    остановке HA).
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+        self._refs: dict[str, int] = {}
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_close_all)
+
+    @callback
+    def acquire(self, host: str) -> aiohttp.ClientSession:
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=LIMIT_PER_HOST,
+                    ttl_dns_cache=DNS_CACHE_TTL,
+                    keepalive_timeout=KEEPALIVE,
+                    ssl=get_default_context(),
+                ),
+            )
+            self._sessions[host] = session
+            _LOGGER.debug("Opened connection pool for %s", host)
+
+        self._refs[host] = self._refs.get(host, 0) + 1
+        return session
+
+    async def async_release(self, host: str) -> None:
+        refs = self._refs.get(host, 0) - 1
+        if refs > 0:
+            self._refs[host] = refs
+            return
+
+        self._refs.pop(host, None)
+        session = self._sessions.pop(host, None)
+        if session is not None:
+            await session.close()
+            _LOGGER.debug("Closed connection pool for %s", host)
+
+    async def _async_close_all(self, event: Event) -> None:
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        self._refs.clear()
+        for session in sessions:
+            await session.close()
+
+
+@singleton(DATA_HOST_SESSIONS)
+@callback
+def get_host_sessions(hass: HomeAssistant) -> HostSessions:
+    """Return the integration-wide per-host session pool."""
+    return HostSessions(hass)
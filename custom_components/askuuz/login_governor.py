@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+
+from .api.errors import INVALID_CREDENTIALS_CODES, HttpError, RateLimitError
+from .const import DATA_LOGIN_GOVERNOR, DOMAIN
+
+T = TypeVar("T")
+
+# не больше MAX_REJECTIONS отказов в логине за REJECTION_WINDOW
+# на (сервис, логин) — провайдеры блокируют аккаунт за перебор
+MAX_REJECTIONS = 3
+REJECTION_WINDOW = 60 * 60
+# столько отвергнутый пароль не отправляется повторно
+BAD_PASSWORD_TTL = 60 * 60
+
+
+class LoginBlocked(Exception):
+    """Login was not attempted: known-bad password or budget exhausted."""
+
+    def __init__(self, reason: str, retry_in: float | None = None) -> None:
+        super().__init__(reason)
+        self.reason = reason  # "invalid_auth" / "too_many_attempts"
+        self.retry_in = retry_in
+
+
+def is_rejection(err: BaseException) -> bool:
+    """True if the upstream explicitly rejected the credentials.
+
+    Только 401 / 403 или известный код «неверный пароль». Прочие 4xx
+    (смена API) и 200 без токена — не отказ: пароль не запоминается.
+    """
+    if isinstance(err, RateLimitError):
+        return False
+    if isinstance(err, HttpError):
+        return err.status in (401, 403) or err.error_code in INVALID_CREDENTIALS_CODES
+    return False
+
+
+def _digest(password: str) -> str:
+    return hashlib.sha256(f"{DOMAIN}:{password}".encode()).hexdigest()
+
+
+class LoginGovernor:
+    """Per (service, username) login budget and negative cache.
+
+    Отказ провайдера запоминается по хешу пароля: BAD_PASSWORD_TTL
+    секунд (или пока пароль не сменят) повторный логин с ним не
+    отправляется вовсе. Сетевые ошибки бюджет не расходуют. Состояние —
+    только в памяти.
+    """
+
+    def __init__(self) -> None:
+        self._rejections: dict[str, deque[float]] = {}
+        # (service, login) → хеш пароля → когда отвергнут (monotonic)
+        self._bad: dict[str, dict[str, float]] = {}
+
+    @staticmethod
+    def _key(service: str, username: str) -> str:
+        return f"{service}:{username}"
+
+    def check(self, service: str, username: str, password: str) -> None:
+        """Raise LoginBlocked if this login must not reach the upstream."""
+        key = self._key(service, username)
+
+        rejected_at = self._bad.get(key, {}).get(_digest(password))
+        if rejected_at is not None:
+            if time.monotonic() - rejected_at < BAD_PASSWORD_TTL:
+                raise LoginBlocked("invalid_auth")
+            del self._bad[key][_digest(password)]
+
+        rejections = self._recent(key)
+        if len(rejections) >= MAX_REJECTIONS:
+            raise LoginBlocked(
+                "too_many_attempts",
+                retry_in=rejections[0] + REJECTION_WINDOW - time.monotonic(),
+            )
+
+    def _recent(self, key: str) -> deque[float]:
+        rejections = self._rejections.setdefault(key, deque())
+        horizon = time.monotonic() - REJECTION_WINDOW
+        while rejections and rejections[0] < horizon:
+            rejections.popleft()
+        return rejections
+
+    async def async_login(
+        self,
+        service: str,
+        username: str,
+        password: str,
+        login: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Run ``login`` under the budget; remember a rejection."""
+        self.check(service, username, password)
+        key = self._key(service, username)
+
+        try:
+            result = await login()
+        except Exception as err:
+            if is_rejection(err):
+                self._recent(key).append(time.monotonic())
+                self._bad.setdefault(key, {})[_digest(password)] = time.monotonic()
+            raise
+
+        # пароль подошёл → старые отказы больше не важны
+        self._rejections.pop(key, None)
+        self._bad.pop(key, None)
+        return result
+
+
+@singleton(DATA_LOGIN_GOVERNOR)
+@callback
+def get_login_governor(hass: HomeAssistant) -> LoginGovernor:
+    """Return the integration-wide login governor."""
+    return LoginGovernor()
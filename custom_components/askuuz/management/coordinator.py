@@ -6,9 +6,11 @@ from typing import Any
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import UpdateFailed
-from homeassistant.exceptions import ConfigEntryAuthFailed
 
 from ..base_coordinator import BaseASKUCoordinator, TOKEN_TTL
+from ..token_pool import AuthToken, token_expiry
+from ..api.base import SECTION_HISTORY, IdentityMemo, cached_period
+from ..api.executor import Step, execute
 from ..api.management import ManagementApiClient
 
 _LOGGER = logging.getLogger(__name__)
@@ -17,6 +19,9 @@ _LOGGER = logging.getLogger(__name__)
 class ManagementDataUpdateCoordinator(BaseASKUCoordinator):
     """ASKU Management coordinator (with optional Gas extension)."""
 
+    SERVICE = "management"
+    API_CLIENT = ManagementApiClient
+
     # ------------------------------------------------------------------
     # Base coordinator implementation
     # ------------------------------------------------------------------
@@ -31,11 +36,13 @@ class ManagementDataUpdateCoordinator(BaseASKUCoordinator):
         *,
         enable_gas: bool = False,
         gas_account_id: str | None = None,
+        options: dict | None = None,
     ) -> None:
         self._enable_gas = enable_gas
         self._gas_account_id = gas_account_id
 
         self._yandex_token: str | None = None
+        self._memo = IdentityMemo()
 
         super().__init__(
             hass,
@@ -43,23 +50,32 @@ class ManagementDataUpdateCoordinator(BaseASKUCoordinator):
             username,
             password,
             account_id,
+            options=options,
         )
 
-    def _create_api_client(self, session) -> ManagementApiClient:
-        return ManagementApiClient(session)
+    @staticmethod
+    async def login_token(
+        api: ManagementApiClient, username: str, password: str
+    ) -> AuthToken:
+        result = await api.login(username, password)
+
+        return AuthToken(
+            value=result["access_token"],
+            expires_at=token_expiry(
+                result["access_token"], result, default_ttl=TOKEN_TTL
+            ),
+            extra={"yandex_token": result["yandex_token"]},
+        )
 
-    async def _login(self) -> None:
-        try:
-            result = await self._api.login(self._username, self._password)
-        except Exception as err:
-            # неверный логин / пароль
-            raise ConfigEntryAuthFailed from err
+    def _apply_token(self, token: AuthToken) -> None:
+        super()._apply_token(token)
+        self._yandex_token = token.extra.get("yandex_token")
 
-        self._token = result["access_token"]
-        self._yandex_token = result["yandex_token"]
-        self._token_expires_at = self.hass.loop.time() + TOKEN_TTL
+    def _reset_token(self) -> None:
+        super()._reset_token()
+        self._yandex_token = None
 
-    async def _fetch_data(self) -> dict[str, Any]:
+    async def _fetch_data(self, sections: frozenset[str]) -> dict[str, Any]:
         assert self._token is not None
         assert self._yandex_token is not None
 
@@ -68,44 +84,66 @@ class ManagementDataUpdateCoordinator(BaseASKUCoordinator):
         last_month = now.month - 1 or 12
         last_month_year = current_year if now.month != 1 else current_year - 1
 
-        dashboard = await self._api.get_dashboard(
-            token=self._token,
-            yandex_token=self._yandex_token,
-            year=current_year,
-        )
+        # --------------------------------------------------------------
+        # dashboard / accruals / gas независимы → параллельно
+        # --------------------------------------------------------------
 
-        accruals = await self._api.get_accruals(
-            token=self._token,
-            yandex_token=self._yandex_token,
-            year=str(last_month_year),
-        )
+        async def _dashboard(_: dict[str, Any]) -> dict[str, Any]:
+            return await self._api.get_dashboard(
+                token=self._token,
+                yandex_token=self._yandex_token,
+                year=current_year,
+            )
+
+        async def _accruals(_: dict[str, Any]) -> dict[str, Any]:
+            # начисления прошлого года (в январе) уже не меняются → из кеша
+            return await cached_period(
+                self._period_cache,
+                "accruals",
+                str(last_month_year),
+                lambda: self._api.get_accruals(
+                    token=self._token,
+                    yandex_token=self._yandex_token,
+                    year=str(last_month_year),
+                ),
+            )
 
-        data: dict[str, Any] = self._normalize_management(
-            dashboard,
-            accruals,
-            last_month,
-            last_month_year,
-        )
+        # dashboard — дешёвый «баланс», /nachisleniya — история
+        steps = [Step("dashboard", _dashboard)]
+        if SECTION_HISTORY in sections:
+            steps.append(Step("accruals", _accruals))
 
         # --------------------------------------------------------------
         # GAS EXTENSION (service-specific, isolated, bottom of file)
         # --------------------------------------------------------------
         if self._enable_gas and self._gas_account_id:
-            try:
-                gas_raw = await self._api.get_gas_data(
-                    token=self._token,
-                    yandex_token=self._yandex_token,
-                )
-                data["gas"] = self._normalize_gas(gas_raw)
-            except Exception as err:
-                _LOGGER.warning(
-                    "Failed to fetch gas data for account %s: %s",
-                    self._gas_account_id,
-                    err,
-                )
-                data["gas"] = None
-        else:
-            data["gas"] = None
+
+            async def _gas(_: dict[str, Any]) -> dict[str, Any] | None:
+                try:
+                    gas_raw = await self._api.get_gas_data(
+                        token=self._token,
+                        yandex_token=self._yandex_token,
+                    )
+                    return self._normalize_gas(gas_raw)
+                except Exception as err:
+                    _LOGGER.warning(
+                        "Failed to fetch gas data for account %s: %s",
+                        self._gas_account_id,
+                        err,
+                    )
+                    return None
+
+            steps.append(Step("gas", _gas))
+
+        results = await execute(steps)
+
+        data: dict[str, Any] = self._normalize_management(
+            results["dashboard"],
+            results.get("accruals"),
+            last_month,
+            last_month_year,
+        )
+        data["gas"] = results.get("gas")
 
         return data
 
@@ -116,10 +154,11 @@ class ManagementDataUpdateCoordinator(BaseASKUCoordinator):
     def _normalize_management(
         self,
         dashboard: dict[str, Any],
-        accruals: dict[str, Any],
+        accruals: dict[str, Any] | None,
         last_month: int,
         last_month_year: int,
     ) -> dict[str, Any]:
+        """Canonical management data; without accruals no ``last_month``."""
         balance = dashboard["balance"] * -1
         my_area = dashboard["my_area"]
         tariff = float(dashboard["price"])
@@ -129,13 +168,19 @@ class ManagementDataUpdateCoordinator(BaseASKUCoordinator):
             dashboard["payments"][0] if dashboard.get("payments") else None
         )
 
-        last_month_item = next(
-            (
-                x
-                for x in accruals.get("current", [])
-                if x["month"] == last_month and x["year"] == last_month_year
+        # /nachisleniya не изменился (тот же объект) → без повторного поиска
+        last_month_item = self._memo.get(
+            "accruals",
+            accruals,
+            (last_month, last_month_year),
+            lambda: next(
+                (
+                    x
+                    for x in (accruals or {}).get("current", [])
+                    if x["month"] == last_month and x["year"] == last_month_year
+                ),
+                None,
             ),
-            None,
         )
 
         data = {
@@ -181,6 +226,10 @@ class ManagementDataUpdateCoordinator(BaseASKUCoordinator):
             },
         }
 
+        if accruals is None:
+            # раздел истории не запрашивался → прошлое значение сохранится
+            del data["data"]["last_month"]
+
         return data
 
     # ------------------------------------------------------------------
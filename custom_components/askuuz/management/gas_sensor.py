@@ -12,6 +12,7 @@ from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .coordinator import ManagementDataUpdateCoordinator
+from ..attributes import balance_attributes
 from ..const import DOMAIN
 
 
@@ -78,7 +79,8 @@ class ASKUGasSensor(
         key: str,
         cfg: dict[str, Any],
     ) -> None:
-        super().__init__(coordinator)
+        # только поддерево газа
+        super().__init__(coordinator, context=("gas",))
 
         self._key = key
         self._with_attrs = cfg.get("attrs", False)
@@ -102,4 +104,4 @@ class ASKUGasSensor(
     def extra_state_attributes(self):
         if not self._with_attrs:
             return None
-        return self.coordinator.data.get("gas")
+        return balance_attributes(self.coordinator.data.get("gas"))
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.singleton import singleton
+from homeassistant.helpers.storage import Store
+
+from .const import DATA_PERIOD_CACHE, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.closed_periods"
+SAVE_DELAY = 30
+
+# Поздние корректировки приходят в первые дни после закрытия месяца
+CLOSE_GRACE = timedelta(days=5)
+MAX_ITEMS_PER_SCOPE = 64
+
+
+def period_end(period: str) -> date:
+    """Return the first day after ``period`` ('YYYY-MM' or 'YYYY')."""
+    if len(period) == 4:
+        return date(int(period) + 1, 1, 1)
+
+    year, month = map(int, period.split("-"))
+    if month == 12:
+        return date(year + 1, 1, 1)
+    return date(year, month + 1, 1)
+
+
+def is_closed(period: str, now: datetime | None = None) -> bool:
+    """Return True if data for ``period`` can no longer change."""
+    now = now or datetime.now()
+    return now.date() >= period_end(period) + CLOSE_GRACE
+
+
+class ClosedPeriodCache:
+    """Persistent cache of closed billing periods.
+
+    Ключ: service:account → name:period. Открытые периоды не хранятся.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._scopes: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load()
+        if stored:
+            self._scopes = stored.get("scopes", {})
+
+    def scope(self, service: str, account_id: str) -> PeriodScope:
+        return PeriodScope(self, f"{service}:{account_id}")
+
+    def get(self, scope: str, name: str, period: str) -> Any | None:
+        return self._scopes.get(scope, {}).get(f"{name}:{period}")
+
+    def set(self, scope: str, name: str, period: str, value: Any) -> None:
+        if not is_closed(period):
+            return
+
+        items = self._scopes.setdefault(scope, {})
+        items[f"{name}:{period}"] = value
+
+        # самые старые периоды вытесняются первыми
+        while len(items) > MAX_ITEMS_PER_SCOPE:
+            oldest = min(items, key=lambda key: key.split(":", 1)[1])
+            del items[oldest]
+
+        _LOGGER.debug("Cached closed period %s %s:%s", scope, name, period)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"scopes": self._scopes}
+
+
+class PeriodScope:
+    """Closed-period cache bound to one service account."""
+
+    def __init__(self, cache: ClosedPeriodCache, scope: str) -> None:
+        self._cache = cache
+        self._scope = scope
+
+    def get(self, name: str, period: str) -> Any | None:
+        return self._cache.get(self._scope, name, period)
+
+    def set(self, name: str, period: str, value: Any) -> None:
+        self._cache.set(self._scope, name, period, value)
+
+
+@singleton(DATA_PERIOD_CACHE)
+async def async_get_period_cache(hass: HomeAssistant) -> ClosedPeriodCache:
+    """Return the integration-wide closed-period cache."""
+    cache = ClosedPeriodCache(hass)
+    await cache.async_load()
+    return cache
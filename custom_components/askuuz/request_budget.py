@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.singleton import singleton
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api.quota import RequestBudget
+from .const import (
+    DATA_REQUEST_BUDGET,
+    REQUEST_BUDGET_PER_ACCOUNT,
+    REQUEST_BUDGET_PER_HOST,
+)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "askuuz.request_budget"
+SAVE_DELAY = 30
+
+
+@singleton(DATA_REQUEST_BUDGET)
+async def async_get_request_budget(hass: HomeAssistant) -> RequestBudget:
+    """Return the integration-wide daily request budget, restored from disk.
+
+    Счётчики переживают рестарт HA; день — по локальному времени HA.
+    """
+    store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+
+    budget = RequestBudget(
+        per_account=REQUEST_BUDGET_PER_ACCOUNT,
+        per_host=REQUEST_BUDGET_PER_HOST,
+        today=lambda: dt_util.now().date(),
+        on_change=lambda: store.async_delay_save(budget.as_dict, SAVE_DELAY),
+    )
+    budget.restore(await store.async_load() or {})
+    return budget
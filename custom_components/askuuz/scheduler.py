@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+
+from .const import DATA_SCHEDULER, DOMAIN
+
+if TYPE_CHECKING:
+    from .base_coordinator import BaseASKUCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_USER = 0        # кнопка / сервис refresh_data / первый запрос
+PRIORITY_BACKGROUND = 1  # плановый опрос
+
+MAX_PER_HOST = 2                        # одновременных обновлений на хост
+STARTUP_WINDOW = timedelta(minutes=5)   # разброс догоняющих обновлений после старта
+
+
+class EntryRemoved(Exception):
+    """The entry was unloaded before its requested refresh ran."""
+
+
+def _jitter(entry_id: str) -> float:
+    """Deterministic fraction in [0, 1) for an entry."""
+    digest = hashlib.sha256(f"{DOMAIN}:{entry_id}".encode()).digest()
+    return int.from_bytes(digest[:4], "big") / 2**32
+
+
+class RefreshScheduler:
+    """Integration-wide refresh scheduler.
+
+    Одна куча сроков (priority, due) на все записи вместо отдельного
+    таймера у каждого координатора. Записи разнесены по интервалу
+    детерминированным джиттером, на каждый upstream-хост одновременно
+    выполняется не более MAX_PER_HOST обновлений, ручные обновления
+    обгоняют плановые.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._seq = itertools.count()
+        self._heap: list[tuple[int, float, int, str]] = []
+        # актуальный элемент кучи на запись (остальные — устаревшие)
+        self._queued: dict[str, tuple[int, float, int, str]] = {}
+        self._coordinators: dict[str, BaseASKUCoordinator] = {}
+        # записи с плановым опросом (остальные — разовые запросы)
+        self._scheduled: set[str] = set()
+        self._jobs: dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._waiters: dict[str, list[asyncio.Future[None]]] = {}
+        self._running: dict[str, int] = {}
+        self._active: set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    @callback
+    def async_add(self, coordinator: BaseASKUCoordinator, *, soon: bool = False) -> None:
+        """Start scheduling ``coordinator``.
+
+        Первый плановый запуск — в случайной (но постоянной для записи)
+        точке интервала; ``soon`` — в пределах STARTUP_WINDOW (устаревший
+        снапшот после рестарта).
+        """
+        entry_id = coordinator.entry_id
+        self._coordinators[entry_id] = coordinator
+        self._scheduled.add(entry_id)
+        coordinator.scheduler = self
+
+        window = STARTUP_WINDOW if soon else coordinator.poll_interval
+        self._push(entry_id, PRIORITY_BACKGROUND, window.total_seconds() * _jitter(entry_id))
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        self._scheduled.discard(entry_id)
+        coordinator = self._coordinators.pop(entry_id, None)
+        if coordinator is not None:
+            coordinator.scheduler = None
+
+        self._queued.pop(entry_id, None)
+        self._jobs.pop(entry_id, None)
+        # не cancel(): CancelledError пробил бы gather в refresh_data
+        for waiter in self._waiters.pop(entry_id, []):
+            if not waiter.done():
+                waiter.set_exception(EntryRemoved(f"Entry {entry_id} was unloaded"))
+
+        if not self._coordinators and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    async def async_request(
+        self,
+        coordinator: BaseASKUCoordinator,
+        job: Callable[[], Awaitable[Any]] | None = None,
+    ) -> None:
+        """Run a refresh of ``coordinator`` ahead of background work and wait.
+
+        ``job`` заменяет обычный ``async_refresh`` (первый запрос записи,
+        ещё не добавленной в планировщик); его исключение пробрасывается
+        вызывающему.
+        """
+        entry_id = coordinator.entry_id
+        self._coordinators.setdefault(entry_id, coordinator)
+        if job is not None:
+            self._jobs[entry_id] = job
+
+        waiter: asyncio.Future[None] = self._hass.loop.create_future()
+        self._waiters.setdefault(entry_id, []).append(waiter)
+
+        queued = self._queued.get(entry_id)
+        if queued is None or queued[0] != PRIORITY_USER:
+            self._push(entry_id, PRIORITY_USER, 0)
+
+        await waiter
+
+    @callback
+    def next_poll(self, entry_id: str) -> float | None:
+        """Seconds until the next queued refresh of ``entry_id`` (0 — running)."""
+        if entry_id in self._active:
+            return 0.0
+        item = self._queued.get(entry_id)
+        if item is None:
+            return None
+        return max(item[1] - self._hass.loop.time(), 0.0)
+
+    @callback
+    def _push(self, entry_id: str, priority: int, delay: float) -> None:
+        item = (priority, self._hass.loop.time() + delay, next(self._seq), entry_id)
+        self._queued[entry_id] = item
+        heapq.heappush(self._heap, item)
+        self._wakeup.set()
+
+        if self._task is None:
+            self._task = self._hass.async_create_background_task(
+                self._async_run(), name=f"{DOMAIN} refresh scheduler"
+            )
+
+    # ------------------------------------------------------------------
+    # Dispatch loop
+    # ------------------------------------------------------------------
+
+    async def _async_run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = self._hass.loop.time()
+
+            item = self._next_ready(now)
+            if item is not None:
+                self._dispatch(item)
+                continue
+
+            # просроченные, но упёршиеся в лимит хоста ждут завершения
+            # текущих обновлений (оно будит цикл), а не крутят его
+            next_due = self._next_due(now)
+            timeout = None if next_due is None else next_due - now
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    def _next_ready(self, now: float) -> tuple[int, float, int, str] | None:
+        """Best due item whose host has a free slot (user items first)."""
+        for item in sorted(self._heap):
+            _, due, _, entry_id = item
+            if self._queued.get(entry_id) != item:
+                continue  # устаревший элемент
+            if due > now:
+                # все пользовательские элементы «уже пора» → дальше только плановые
+                if item[0] == PRIORITY_BACKGROUND:
+                    return None
+                continue
+            if entry_id in self._active:
+                continue
+            if self._running.get(self._host(entry_id), 0) >= MAX_PER_HOST:
+                continue
+            return item
+        return None
+
+    def _next_due(self, now: float) -> float | None:
+        """Earliest future due time (stale heap items are dropped here)."""
+        self._heap = [item for item in self._heap if self._queued.get(item[3]) == item]
+        heapq.heapify(self._heap)
+        return min((item[1] for item in self._heap if item[1] > now), default=None)
+
+    def _host(self, entry_id: str) -> str:
+        return self._coordinators[entry_id].upstream_host
+
+    @callback
+    def _dispatch(self, item: tuple[int, float, int, str]) -> None:
+        entry_id = item[3]
+        del self._queued[entry_id]
+
+        host = self._host(entry_id)
+        self._running[host] = self._running.get(host, 0) + 1
+        self._active.add(entry_id)
+
+        self._hass.async_create_background_task(
+            self._async_refresh(entry_id, host), name=f"{DOMAIN} refresh {entry_id}"
+        )
+
+    async def _async_refresh(self, entry_id: str, host: str) -> None:
+        coordinator = self._coordinators.get(entry_id)
+        job = self._jobs.pop(entry_id, None)
+        waiters = self._waiters.pop(entry_id, [])
+        error: BaseException | None = None
+
+        try:
+            if coordinator is not None:
+                await (job() if job is not None else coordinator.async_refresh())
+        except Exception as err:
+            error = err
+        finally:
+            self._running[host] -= 1
+            self._active.discard(entry_id)
+
+            for waiter in waiters:
+                if waiter.done():
+                    continue
+                if error is not None:
+                    waiter.set_exception(error)
+                else:
+                    waiter.set_result(None)
+
+            # следующий плановый запуск, если не ждёт ручной
+            if entry_id in self._queued:
+                pass
+            elif entry_id in self._scheduled:
+                self._push(
+                    entry_id,
+                    PRIORITY_BACKGROUND,
+                    self._coordinators[entry_id].poll_interval.total_seconds(),
+                )
+            else:
+                self._coordinators.pop(entry_id, None)
+            self._wakeup.set()
+
+        if error is not None and not waiters:
+            _LOGGER.warning("Refresh of %s failed: %s", entry_id, error)
+
+
+@singleton(DATA_SCHEDULER)
+@callback
+def get_scheduler(hass: HomeAssistant) -> RefreshScheduler:
+    """Return the integration-wide refresh scheduler."""
+    return RefreshScheduler(hass)
@@ -20,19 +20,16 @@ async def async_setup_entry(
         from .electricity.sensor import async_setup_entry as electricity_setup
 
         await electricity_setup(hass, entry, async_add_entities)
-        return
 
     elif service == "water":
         from .water.sensor import async_setup_entry as water_setup
 
         await water_setup(hass, entry, async_add_entities)
-        return
 
     elif service == "tbo":
         from .tbo.sensor import async_setup_entry as tbo_setup
 
         await tbo_setup(hass, entry, async_add_entities)
-        return
 
     elif service == "management":
         from .management.sensor import async_setup_entry as management_setup
@@ -40,9 +37,14 @@ async def async_setup_entry(
 
         await management_setup(hass, entry, async_add_entities)
         await gas_setup(hass, entry, async_add_entities)
-        return
 
-    # Safety fallback — should never happen if config_flow is correct
-    raise ValueError(
-        f"Unsupported service type '{service}' for {DOMAIN} integration"
-    )
+    else:
+        # Safety fallback — should never happen if config_flow is correct
+        raise ValueError(
+            f"Unsupported service type '{service}' for {DOMAIN} integration"
+        )
+
+    # счётчики запросов — общие для всех сервисов, на том же устройстве
+    from .usage_sensor import async_setup_entry as usage_setup
+
+    await usage_setup(hass, entry, async_add_entities)
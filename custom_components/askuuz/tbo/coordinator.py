@@ -3,11 +3,10 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-from homeassistant.exceptions import ConfigEntryAuthFailed
 
 from ..base_coordinator import BaseASKUCoordinator, TOKEN_TTL
+from ..token_pool import AuthToken, token_expiry
 from ..api.tbo import TboApiClient
-from ..api.base import ApiError
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -15,42 +14,32 @@ _LOGGER = logging.getLogger(__name__)
 class TboDataUpdateCoordinator(BaseASKUCoordinator):
     """ASKU TBO coordinator."""
 
+    SERVICE = "tbo"
+    API_CLIENT = TboApiClient
+
     # ------------------------------------------------------------------
     # Base coordinator implementation
     # ------------------------------------------------------------------
 
-    def _create_api_client(self, session) -> TboApiClient:
-        return TboApiClient(session=session)
-
-    async def _login(self) -> None:
-        try:
-            token = await self._api.login(
-                pid=self._username,
-                pin=self._password,
-            )
-        except Exception as err:
-            raise ConfigEntryAuthFailed from err
+    @staticmethod
+    async def login_token(
+        api: TboApiClient, username: str, password: str
+    ) -> AuthToken:
+        token = await api.login(pid=username, pin=password)
 
-        self._token = token
-        # API не отдаёт expires → берём запас, как в electricity
-        self._token_expires_at = self.hass.loop.time() + TOKEN_TTL
+        # API не отдаёт expires → JWT exp, иначе запас, как в electricity
+        return AuthToken(
+            value=token,
+            expires_at=token_expiry(token, default_ttl=TOKEN_TTL),
+        )
 
-    async def _fetch_data(self) -> dict[str, Any]:
+    async def _fetch_data(self, sections: frozenset[str]) -> dict[str, Any]:
         assert self._token is not None
 
-        try:
-            data = await self._api.get_data(
-                token=self._token,
-                account_id=self._account_id,
-            )
-            return data
-
-        except ApiError as err:
-            message = str(err)
-
-            # 401 / 403 → проброс для retry в BaseASKUCoordinator
-            if "401" in message or "403" in message:
-                raise PermissionError from err
-
-            # Любая временная ошибка → fallback в base
-            raise err
+        # 401 / 403 (AuthError) → relogin и повтор в BaseASKUCoordinator
+        return await self._api.get_data(
+            token=self._token,
+            account_id=self._account_id,
+            cache=self._period_cache,
+            sections=sections,
+        )
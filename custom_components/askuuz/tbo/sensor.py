@@ -9,6 +9,7 @@ from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .coordinator import TboDataUpdateCoordinator
+from ..attributes import BALANCE_ATTR_KEYS, balance_attributes
 from ..const import DOMAIN
 
 
@@ -59,7 +60,11 @@ class ASKUTboSensor(
     _attr_has_entity_name = True
 
     def __init__(self, coordinator, device_info, key, cfg):
-        super().__init__(coordinator)
+        # обновляемся только при изменении своих ключей
+        super().__init__(
+            coordinator,
+            context=BALANCE_ATTR_KEYS if cfg.get("attrs", False) else (key,),
+        )
 
         self._key = key
         self._with_attrs = cfg.get("attrs", False)
@@ -80,4 +85,4 @@ class ASKUTboSensor(
     def extra_state_attributes(self):
         if not self._with_attrs:
             return None
-        return self.coordinator.data
+        return balance_attributes(self.coordinator.data)
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.singleton import singleton
+from homeassistant.helpers.storage import Store
+
+from .const import DATA_TOKEN_POOL, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.tokens"
+SAVE_DELAY = 10
+
+# Токен обновляется в фоне незадолго до истечения, чтобы обновление
+# данных никогда не логинилось на горячем пути: за REFRESH_MARGIN, но
+# не раньше чем за REFRESH_FRACTION срока жизни (короткие токены).
+REFRESH_MARGIN = 15 * 60
+REFRESH_FRACTION = 0.2
+MIN_REFRESH_DELAY = 60
+# запас на расхождение часов с сервером
+EXPIRY_SKEW = 60
+
+
+@dataclass(slots=True)
+class AuthToken:
+    """Access token shared by all entries of one login."""
+
+    value: str
+    expires_at: float  # wall clock (time.time())
+    extra: dict[str, Any] = field(default_factory=dict)
+    issued_at: float = field(default_factory=time.time)
+
+    @property
+    def refresh_margin(self) -> float:
+        """How long before expiry the background renewal should run."""
+        ttl = max(self.expires_at - self.issued_at, 0.0)
+        return min(REFRESH_MARGIN, REFRESH_FRACTION * ttl)
+
+
+def token_key(service: str, username: str, password: str) -> str:
+    """Pool key: service + username + password digest.
+
+    Пароль входит в ключ только как хеш: записи с одним логином, но
+    разными (например, устаревшим) паролями не ломают друг другу вход.
+    """
+    digest = hashlib.sha256(password.encode()).hexdigest()[:16]
+    return f"{service}:{username}:{digest}"
+
+
+def _jwt_exp(value: str) -> float | None:
+    """Return the ``exp`` claim of a JWT, if the token is one."""
+    parts = value.split(".")
+    if len(parts) != 3:
+        return None
+
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims["exp"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _response_ttl(response: Any) -> float | None:
+    """Return ``expires_in`` (seconds) from a login response, if present."""
+    for block in (response, response.get("data") if isinstance(response, dict) else None):
+        if not isinstance(block, dict):
+            continue
+        for name in ("expires_in", "expiresIn"):
+            try:
+                return float(block[name])
+            except (KeyError, TypeError, ValueError):
+                continue
+    return None
+
+
+def token_expiry(value: str, response: Any = None, *, default_ttl: float) -> float:
+    """Wall-clock expiry: JWT ``exp`` → ``expires_in`` of the response → default."""
+    now = time.time()
+
+    exp = _jwt_exp(value) if isinstance(value, str) else None
+    if exp is None:
+        ttl = _response_ttl(response)
+        exp = now + ttl if ttl is not None else None
+
+    if exp is None or exp <= now:
+        return now + default_ttl
+
+    return exp - EXPIRY_SKEW
+
+
+class TokenPool:
+    """Process-wide token pool with single-flight login.
+
+    Все конкурентные запросы токена по одному ключу ждут один и тот же
+    вход; 401 у любой записи сбрасывает токен для всех. Токены
+    переживают перезапуск HA: хранятся в .storage открытым текстом,
+    файл доступен только владельцу (``private=True``) — как и
+    core.config_entries с паролями рядом. Пока у ключа есть
+    зарегистрированные записи, токен обновляется в фоне незадолго до
+    истечения.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY, private=True
+        )
+        self._tokens: dict[str, AuthToken] = {}
+        # то, что лежит на диске: {"value", "expires_at", "extra"}
+        self._records: dict[str, dict[str, Any]] = {}
+        self._logins: dict[str, asyncio.Task[AuthToken]] = {}
+        # кто умеет логиниться по ключу и через сколько секунд его
+        # следующий опрос (для фонового обновления)
+        self._refreshers: dict[
+            str,
+            list[tuple[Callable[[], Awaitable[AuthToken]], Callable[[], float | None]]],
+        ] = {}
+        self._timers: dict[str, CALLBACK_TYPE] = {}
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load()
+        if stored:
+            now = time.time()
+            self._records = {
+                key: record
+                for key, record in stored.get("tokens", {}).items()
+                if record.get("expires_at", 0) > now
+            }
+
+    async def async_get(
+        self,
+        key: str,
+        login: Callable[[], Awaitable[AuthToken]],
+    ) -> AuthToken:
+        """Return a valid token, logging in (once for all callers) if needed."""
+        token = self._tokens.get(key)
+        if token is None:
+            token = self._restore(key)
+            if token is not None:
+                self._schedule_refresh(key)
+
+        if token is not None and time.time() < token.expires_at:
+            return token
+
+        # отмена одного ожидающего не должна отменять общий вход
+        return await asyncio.shield(self._login_task(key, login))
+
+    def _login_task(
+        self,
+        key: str,
+        login: Callable[[], Awaitable[AuthToken]],
+    ) -> asyncio.Task[AuthToken]:
+        task = self._logins.get(key)
+        if task is None:
+            task = asyncio.create_task(self._async_login(key, login))
+            self._logins[key] = task
+        else:
+            _LOGGER.debug("Joining in-flight login for %s", key.rsplit(":", 1)[0])
+        return task
+
+    async def _async_login(
+        self,
+        key: str,
+        login: Callable[[], Awaitable[AuthToken]],
+    ) -> AuthToken:
+        try:
+            token = await login()
+        finally:
+            self._logins.pop(key, None)
+
+        self.seed(key, token)
+        return token
+
+    def seed(self, key: str, token: AuthToken) -> None:
+        """Store a token obtained elsewhere (config flow validation)."""
+        self._tokens[key] = token
+        self._records[key] = {
+            "value": token.value,
+            "expires_at": token.expires_at,
+            "extra": token.extra,
+            "issued_at": token.issued_at,
+        }
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        self._schedule_refresh(key)
+
+    def invalidate(self, key: str, value: str | None) -> None:
+        """Drop the token after 401/403 unless it was already replaced."""
+        token = self._tokens.get(key)
+        if token is not None and token.value == value:
+            del self._tokens[key]
+            self._records.pop(key, None)
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    # ------------------------------------------------------------------
+    # Background refresh
+    # ------------------------------------------------------------------
+
+    @callback
+    def async_register(
+        self,
+        key: str,
+        login: Callable[[], Awaitable[AuthToken]],
+        next_poll: Callable[[], float | None],
+    ) -> CALLBACK_TYPE:
+        """Keep the token of ``key`` fresh while the caller is registered.
+
+        ``next_poll`` — через сколько секунд вызывающий снова пойдёт в API
+        (None — неизвестно): фоновое обновление откладывается, пока до
+        ближайшего опроса далеко.
+        """
+        item = (login, next_poll)
+        self._refreshers.setdefault(key, []).append(item)
+        self._schedule_refresh(key)
+
+        @callback
+        def _unregister() -> None:
+            refreshers = self._refreshers.get(key, [])
+            if item in refreshers:
+                refreshers.remove(item)
+            if not refreshers:
+                self._refreshers.pop(key, None)
+                if cancel := self._timers.pop(key, None):
+                    cancel()
+
+        return _unregister
+
+    @callback
+    def _schedule_refresh(self, key: str, delay: float | None = None) -> None:
+        if cancel := self._timers.pop(key, None):
+            cancel()
+
+        token = self._tokens.get(key)
+        if token is None or key not in self._refreshers:
+            return
+
+        if delay is None:
+            delay = token.expires_at - token.refresh_margin - time.time()
+        self._timers[key] = async_call_later(
+            self._hass,
+            max(delay, MIN_REFRESH_DELAY),
+            partial(self._fire_refresh, key),
+        )
+
+    def _next_poll(self, key: str) -> float | None:
+        """Seconds until the earliest known poll of the registered entries."""
+        polls = [
+            poll
+            for _, next_poll in self._refreshers.get(key, [])
+            if (poll := next_poll()) is not None
+        ]
+        return min(polls, default=None)
+
+    @callback
+    def _fire_refresh(self, key: str, _now: Any) -> None:
+        self._timers.pop(key, None)
+
+        token = self._tokens.get(key)
+        next_poll = self._next_poll(key)
+        if (
+            token is not None
+            and next_poll is not None
+            and next_poll > token.refresh_margin
+        ):
+            # до опроса далеко: новый токен понадобится только к нему
+            self._schedule_refresh(key, next_poll - token.refresh_margin)
+            return
+
+        self._hass.async_create_background_task(
+            self._async_refresh(key), name=f"{DOMAIN} token refresh"
+        )
+
+    async def _async_refresh(self, key: str) -> None:
+        refreshers = self._refreshers.get(key)
+        if not refreshers:
+            return
+
+        try:
+            await self._login_task(key, refreshers[-1][0])
+        except Exception as err:
+            # горячий путь сам перелогинится и сообщит об ошибке
+            _LOGGER.debug("Background token refresh failed: %s", err)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _restore(self, key: str) -> AuthToken | None:
+        record = self._records.get(key)
+        if record is None:
+            return None
+
+        try:
+            token = AuthToken(
+                value=record["value"],
+                expires_at=record["expires_at"],
+                extra=record.get("extra") or {},
+                issued_at=record.get("issued_at", time.time()),
+            )
+        except (KeyError, TypeError):
+            _LOGGER.debug("Discarding unreadable stored token")
+            self._records.pop(key, None)
+            return None
+
+        self._tokens[key] = token
+        return token
+
+    def _data_to_save(self) -> dict[str, Any]:
+        now = time.time()
+        return {
+            "tokens": {
+                key: record
+                for key, record in self._records.items()
+                if record["expires_at"] > now
+            }
+        }
+
+
+@singleton(DATA_TOKEN_POOL)
+async def async_get_token_pool(hass: HomeAssistant) -> TokenPool:
+    """Return the integration-wide token pool."""
+    pool = TokenPool(hass)
+    await pool.async_load()
+    return pool
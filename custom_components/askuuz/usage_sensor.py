@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .base_coordinator import CONTEXT_REQUESTS, BaseASKUCoordinator
+from .const import DOMAIN
+
+
+SENSORS = {
+    "requests_today": {
+        "value": lambda coordinator: coordinator.budget_used,
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+    },
+    "request_budget_left": {
+        "value": lambda coordinator: coordinator.budget_left,
+        "state_class": SensorStateClass.MEASUREMENT,
+    },
+}
+
+
+async def async_setup_entry(hass, entry: ConfigEntry, async_add_entities) -> None:
+    """Diagnostic sensors of the daily upstream request budget."""
+    coordinator: BaseASKUCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    # то же устройство, что и у сенсоров сервиса
+    device_info = DeviceInfo(
+        identifiers={(DOMAIN, f"{coordinator.SERVICE}_{coordinator.account_id}")},
+    )
+
+    async_add_entities(
+        [
+            ASKUUsageSensor(coordinator, device_info, key, cfg)
+            for key, cfg in SENSORS.items()
+        ],
+        update_before_add=False,
+    )
+
+
+class ASKUUsageSensor(CoordinatorEntity[BaseASKUCoordinator], SensorEntity):
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = "requests"
+
+    def __init__(self, coordinator, device_info, key, cfg):
+        # после каждого опроса, даже если данные не изменились
+        super().__init__(coordinator, context=(CONTEXT_REQUESTS,))
+
+        self._value = cfg["value"]
+
+        self._attr_translation_key = key
+        self._attr_state_class = cfg.get("state_class")
+        self._attr_unique_id = (
+            f"{DOMAIN}_{coordinator.SERVICE}_{coordinator.account_id}_{key}"
+        )
+        self._attr_device_info = device_info
+
+    @property
+    def native_value(self):
+        return self._value(self.coordinator)
@@ -49,7 +49,8 @@ class RefreshDataButton(
     _attr_translation_key = "refresh_data"
 
     def __init__(self, coordinator, entry, device_info):
-        super().__init__(coordinator)
+        # от данных не зависит → только смена доступности
+        super().__init__(coordinator, context=())
         self._entry = entry
         self._attr_device_info = device_info
 
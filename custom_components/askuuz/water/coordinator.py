@@ -3,11 +3,10 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-from homeassistant.exceptions import ConfigEntryAuthFailed
 
 from ..base_coordinator import BaseASKUCoordinator, TOKEN_TTL
+from ..token_pool import AuthToken, token_expiry
 from ..api.water import WaterApiClient
-from ..api.base import ApiError
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -15,45 +14,33 @@ _LOGGER = logging.getLogger(__name__)
 class WaterDataUpdateCoordinator(BaseASKUCoordinator):
     """ASKU Water coordinator."""
 
+    SERVICE = "water"
+    API_CLIENT = WaterApiClient
+
     # ------------------------------------------------------------------
     # Base coordinator implementation
     # ------------------------------------------------------------------
 
-    def _create_api_client(self, session) -> WaterApiClient:
-        return WaterApiClient(session=session)
-
-    async def _login(self) -> None:
-        try:
-            token = await self._api.login(
-                pid=self._username,
-                pin=self._password,
-            )
-        except Exception as err:
-            raise ConfigEntryAuthFailed from err
+    @staticmethod
+    async def login_token(
+        api: WaterApiClient, username: str, password: str
+    ) -> AuthToken:
+        token = await api.login(pid=username, pin=password)
 
-        self._token = token
-        # Токен живёт долго — берём с запасом, как у electricity
-        self._token_expires_at = self.hass.loop.time() + TOKEN_TTL
+        # срок жизни из JWT exp, иначе — с запасом, как у electricity
+        return AuthToken(
+            value=token,
+            expires_at=token_expiry(token, default_ttl=TOKEN_TTL),
+        )
 
-    async def _fetch_data(self) -> dict[str, Any]:
+    async def _fetch_data(self, sections: frozenset[str]) -> dict[str, Any]:
         assert self._token is not None
 
-        try:
-            data = await self._api.get_data(
-                token=self._token,
-                account_id=self._account_id,
-            )
-            return data
-
-        except ApiError as err:
-            message = str(err)
-
-            # 401 / 403 → проброс для retry в BaseASKUCoordinator
-            if "401" in message or "403" in message:
-                raise PermissionError from err
-
-            # Rate limit / temporary error → fallback в base
-            if "Количество попыток" in message:
-                raise err
-
-            raise err
+        # 401 / 403 (AuthError) → relogin и повтор в BaseASKUCoordinator
+        return await self._api.get_data(
+            token=self._token,
+            account_id=self._account_id,
+            cache=self._period_cache,
+            sections=sections,
+            pid=self._username,
+        )
@@ -10,6 +10,7 @@ from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .coordinator import WaterDataUpdateCoordinator
+from ..attributes import BALANCE_ATTR_KEYS, balance_attributes
 from ..const import DOMAIN
 
 
@@ -62,7 +63,11 @@ class ASKUWaterSensor(
     _attr_has_entity_name = True
 
     def __init__(self, coordinator, entry, device_info, key, cfg):
-        super().__init__(coordinator)
+        # обновляемся только при изменении своих ключей
+        super().__init__(
+            coordinator,
+            context=BALANCE_ATTR_KEYS if cfg.get("attrs", False) else (key,),
+        )
 
         self._key = key
         self._with_attrs = cfg.get("attrs", False)
@@ -85,13 +90,4 @@ class ASKUWaterSensor(
         if not self._with_attrs:
             return None
 
-        data = self.coordinator.data or {}
-        return {
-            "account_id": data.get("account_id"),
-            "current_period": data.get("current_period"),
-            "balance": data.get("balance"),
-            "consumption": data.get("consumption"),
-            "accrual": data.get("accrual"),
-            "last_payment": data.get("last_payment"),
-            "data": data.get("data"),
-        }
+        return balance_attributes(self.coordinator.data)